@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the atom line formatting: per-atom ``AsecIO.vec2str`` vs ``AsecIO.format_rows``.
+
+Usage::
+
+    python benchmarks/bench_format.py -n 1000 100000 1000000
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+from aseconv.pluginbase import AsecIO
+
+
+def _vec2str_lines(sym, pos):
+    return "".join(sym[i] + "   " + AsecIO.vec2str(xyz) + "\n" for i, xyz in enumerate(pos))
+
+
+def _kernel_lines(sym, pos):
+    f = io.StringIO()
+    AsecIO.write_rows(f, "%s   %20.16f %20.16f %20.16f\n", sym, pos)
+    return f.getvalue()
+
+
+def _best(func, *args, repeat=3):
+    ret = None
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        ret = func(*args)
+        best = min(best, time.perf_counter() - t)
+    return best, ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'natoms':>10} {'vec2str(s)':>12} {'kernel(s)':>12} {'speedup':>8}")
+    for n in args.n:
+        pos = rng.random((n, 3)) * 100
+        sym = np.array(["Si", "O", "O"] * (n // 3 + 1), dtype=object)[:n]
+        tv, sv = _best(_vec2str_lines, sym, pos, repeat=args.repeat)
+        tk, sk = _best(_kernel_lines, sym, pos, repeat=args.repeat)
+        if sv != sk:
+            raise Exception(f"Outputs differ for n={n}")
+        print(f"{n:>10} {tv:>12.4f} {tk:>12.4f} {tv / tk:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of the geometry plugins, slab analysis and IO plugins.
+
+Usage::
+
+    python benchmarks/bench_suite.py run -n 100 10000 1000000 -o base.json
+    python benchmarks/bench_suite.py run -n 100 10000 1000000 -o new.json
+    python benchmarks/bench_suite.py compare base.json new.json --threshold 1.2
+
+Structures of about N atoms are generated for every ``-n``: ``bulk`` (Si), ``slab``
+(Cu(111) with vacuum), ``graphene`` and ``traj`` (10 frames of N/10 atoms, written
+and read only with the appending formats). Each case is timed as the best of
+``--repeat`` runs, and cases that fail are kept with the error.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+from ase.build import bulk, fcc111, graphene
+
+
+def _reps(n, per, dims=3):
+    return max(1, int(round((n / per) ** (1.0 / dims))))
+
+
+def make_bulk(n):
+    k = _reps(n, 8)
+    return bulk("Si", cubic=True).repeat((k, k, k))
+
+
+def make_slab(n, layers=4):
+    k = _reps(n, layers, 2)
+    return fcc111("Cu", size=(k, k, layers), vacuum=10.0)
+
+
+def make_graphene(n):
+    k = _reps(n, 2, 2)
+    return graphene(size=(k, k, 1), vacuum=10.0)
+
+
+def make_traj(n, nframes=10):
+    rng = np.random.default_rng(0)
+    base = make_bulk(max(8, n // nframes))
+    ret = []
+    for _ in range(nframes):
+        a = base.copy()
+        a.positions += rng.normal(scale=0.02, size=a.positions.shape)
+        ret.append(a)
+    return ret
+
+
+makers = {
+    "bulk": make_bulk,
+    "slab": make_slab,
+    "graphene": make_graphene,
+    "traj": make_traj,
+}
+
+# (name, command line options, structure kinds) of the geometry plugins
+plugin_cases = [
+    ("noc", ["--noc"], ["bulk"]),
+    ("con", ["--con", "(z>5)"], ["slab"]),
+    ("strain", ["--strain", "1.01a"], ["bulk"]),
+    ("surface", ["--surface", "1,1,1,3"], ["bulk"]),
+    ("scale", ["--scale", "1.01,1.01,1.01"], ["bulk"]),
+    ("rotate", ["--rotate", "30z"], ["bulk"]),
+    ("align", ["--align", "cz"], ["slab"]),
+    ("elsort", ["--elsort"], ["slab"]),
+    ("zsort", ["--zsort"], ["slab"]),
+    ("repeat", ["-r", "2,2,1"], ["bulk"]),
+    ("vadd", ["--vadd", "5"], ["slab"]),
+    ("vset", ["--vset", "15"], ["slab"]),
+    ("tr", ["--tr", "0.1,0.2,0.3"], ["bulk"]),
+    ("sel", ["--sel", "(z>5)"], ["slab"]),
+    ("torec", ["--torec"], ["graphene"]),
+    ("tomono", ["--tomono"], ["graphene"]),
+    ("wrap", ["-w"], ["bulk"]),
+    ("twslab", ["--twslab"], ["slab"]),
+    ("ctrim", ["--ctrim", "hy"], ["graphene"]),
+    ("rmlayer", ["--rmlayer", "0", "--sidx", "3"], ["slab"]),
+]
+
+# Output types of the IO cases, written and read back
+io_types = ["aims", "rmg", "lmp", "lammps-dump", "asecb", "extxyz", "vasp"]
+# Output types appending the frames of a trajectory to one file
+traj_types = ["lammps-dump", "asecb"]
+
+
+def _best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - t)
+    return min(times), sum(times) / len(times)
+
+
+class Suite:
+    """Benchmark cases over the aseconv parser, plugins and IO plugins."""
+
+    def __init__(self, repeat, pattern):
+        from aseconv.main import acmparser
+        import aseconv.main as am
+
+        acmparser()
+        self.asp = am.asp
+        self.repeat = repeat
+        self.pattern = re.compile(pattern)
+        self.results = []
+
+    def _args(self, opts, type="extxyz"):
+        sargs = ["geo", "-t", type, "in"] + opts
+        args = self.asp.parser.parse_args(sargs)
+        args.pProfile = None
+        args.pSink = None
+        args.pInFile = None
+        args.pFrame = None
+        return sargs, args
+
+    def _run(self, name, kind, natoms, func):
+        if not self.pattern.search(name):
+            return
+        rec = {"case": name, "kind": kind, "natoms": natoms}
+        try:
+            rec["best"], rec["mean"] = _best(func, self.repeat)
+        except Exception as e:
+            rec["error"] = f"{type(e).__name__}: {e}"
+        self.results.append(rec)
+        head = f"{name:<24} {kind:<9} {natoms:>9}"
+        if "error" in rec:
+            print(f"{head} {'error':>10}  {rec['error'][:60]}")
+        else:
+            print(f"{head} {rec['best']:>10.4f}")
+
+    def plugins(self, kind, atom):
+        import aseconv.geoutil as gu
+
+        for name, opts, kinds in plugin_cases:
+            if kind not in kinds:
+                continue
+            sargs, args = self._args(opts)
+            args.SlabIdx = args.sidx if args.sidx >= 0 else 0
+
+            def func():
+                self.asp._ordered_loop(sargs, args, "process", atom.copy())
+
+            self._run("plugin:" + name, kind, len(atom), func)
+
+        n = len(atom)
+        self._run("identify_slabaxis", kind, n, lambda: gu.identify_slabaxis(atom))
+        if kind == "slab":
+            self._run("identify_layers", kind, n, lambda: gu.identify_layers(atom, 3))
+
+    def io(self, kind, frames, tmpdir):
+        from pathlib import Path
+
+        natoms = sum(len(x) for x in frames)
+        for type in io_types if len(frames) == 1 else traj_types:
+            sargs, args = self._args([], type)
+            args.pParent = Path(tmpdir)
+            oext = self.asp._oext(type, args)
+            ofile = Path(tmpdir).joinpath(f"{kind}_{natoms}.{oext}")
+
+            def write():
+                ofile.unlink(missing_ok=True)
+                for a in frames:
+                    self.asp._write(args, a, ofile, log=False)
+
+            def read():
+                self.asp._read(args, ofile)
+
+            self._run("write:" + type, kind, natoms, write)
+            if ofile.exists() and "error" not in self.results[-1]:
+                args.i = None if type == "extxyz" else type
+                # The atoms actually read back, for the writers losing frames
+                try:
+                    nread = sum(len(x) for x in self.asp._read(args, ofile))
+                except Exception:
+                    nread = natoms  # the error is kept by the read case
+                self._run("read:" + type, kind, nread, read)
+            ofile.unlink(missing_ok=True)
+
+
+def _meta():
+    from aseconv.cache import versions
+
+    return {
+        "versions": versions(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(args):
+    suite = Suite(args.repeat, args.filter)
+    print(f"{'case':<24} {'kind':<9} {'natoms':>9} {'best(s)':>10}")
+    with tempfile.TemporaryDirectory() as td:
+        for n in args.n:
+            for kind in args.kinds:
+                st = makers[kind](n)
+                if kind == "traj":
+                    suite.io(kind, st, td)
+                    continue
+                suite.plugins(kind, st)
+                suite.io(kind, [st], td)
+    doc = {"meta": _meta(), "repeat": args.repeat, "results": suite.results}
+    if args.o:
+        with open(args.o, "wt") as f:
+            json.dump(doc, f, indent=1)
+        print(f" - Writing '{args.o}'...")
+    return 0
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    def index(doc):
+        return {(r["case"], r["kind"], r["natoms"]): r for r in doc["results"]}
+
+    bidx = index(base)
+    nreg = 0
+    print(f"{'case':<24} {'kind':<9} {'natoms':>9}", end="")
+    print(f" {'base(s)':>10} {'new(s)':>10} {'ratio':>7}")
+    for key, r in index(new).items():
+        b = bidx.get(key)
+        if b is None or "best" not in b or "best" not in r:
+            continue
+        ratio = r["best"] / b["best"] if b["best"] > 0 else float("inf")
+        flag = ""
+        if ratio > args.threshold and r["best"] - b["best"] > args.mintime:
+            flag = "  REGRESSION"
+            nreg += 1
+        elif ratio < 1 / args.threshold:
+            flag = "  faster"
+        print(f"{key[0]:<24} {key[1]:<9} {key[2]:>9}", end="")
+        print(f" {b['best']:>10.4f} {r['best']:>10.4f} {ratio:>7.2f}{flag}")
+    print(f" - {nreg} regression(s) over x{args.threshold}...")
+    return 1 if nreg > 0 else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("run", help="Run the benchmarks.")
+    p.add_argument("-n", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    p.add_argument(
+        "-k", "--kinds", nargs="+", choices=list(makers), default=list(makers)
+    )
+    p.add_argument("-r", "--repeat", type=int, default=3)
+    p.add_argument("-f", "--filter", type=str, default="", help="Regex of case names.")
+    p.add_argument("-o", type=str, default=None, help="JSON result file.")
+    p.set_defaults(func=run)
+
+    p = sub.add_parser("compare", help="Compare two result files.")
+    p.add_argument("base", type=str)
+    p.add_argument("new", type=str)
+    p.add_argument("--threshold", type=float, default=1.2, help="Regression ratio.")
+    p.add_argument(
+        "--mintime", type=float, default=1e-3, help="Ignored slowdown(s) as noise."
+    )
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,9 @@
 """Python CLI utility for geometry manipulation using ASE library."""
+
+import os
+
+if os.environ.get("ASEC_STARTUP_PROFILE", "") != "":
+    # Before any other import, for `aseconv --startup-profile`.
+    from aseconv import startup
+
+    startup.install(os.environ["ASEC_STARTUP_PROFILE"])
@@ -0,0 +1,223 @@
+"""
+Archive (tar/zip) output sink and input source.
+"""
+
+import io
+import fnmatch
+import tarfile
+import threading
+import time
+import zipfile
+from contextlib import nullcontext
+from pathlib import Path, PurePosixPath
+from aseconv.compress import codecs, split_suffix
+
+# Archive suffixes and the tarfile compression (None for zip)
+_archives = {
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tbz2": "bz2",
+    ".tar.xz": "xz",
+    ".txz": "xz",
+    ".zip": None,
+}
+
+
+def archive_type(file) -> str:
+    """The archive suffix of a file name such as '.tar.gz', or None if not an archive."""
+    name = Path(file).name.lower()
+    for x in sorted(_archives, key=len, reverse=True):
+        if name.endswith(x):
+            return x
+    return None
+
+
+class ArchiveMember(io.BytesIO):
+    """In-memory buffer of an archive member.
+
+    Plugins write to it like a file (``str`` is encoded as UTF-8). It is added to the
+    archive by ``ArchiveSink.commit``, or on ``close`` for the members from ``ArchiveSink.open``.
+    The members from ``ArchiveSource`` hold the input contents.
+
+    Attributes:
+        sink: The archive sink or source.
+        name: The member name.
+    """
+
+    def __init__(self, sink, name: str, autocommit: bool = False):
+        super().__init__()
+        self.sink = sink
+        self.name: str = name
+        self._auto = autocommit
+
+    def __str__(self):
+        return f"{self.sink.file}::{self.name}"
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.name).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.name).suffix
+
+    @property
+    def parent(self) -> PurePosixPath:
+        return PurePosixPath(self.name).parent
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        return super().write(data)
+
+    def reopen(self, mode: str = "rt"):
+        """Rewind, truncate or seek to the end as ``open`` does with ``mode``.
+
+        Returns:
+            A context of the member, or of a text wrapper for reading in text mode.
+        """
+        if "a" in mode:
+            self.seek(0, 2)
+        else:
+            self.seek(0)
+            if "w" in mode:
+                self.truncate()
+            elif "b" not in mode and "+" not in mode:
+                return io.TextIOWrapper(self, encoding="utf-8")
+        return nullcontext(self)
+
+    def exists(self) -> bool:
+        with self.getbuffer() as buf:
+            return buf.nbytes > 0
+
+    def unlink(self, missing_ok: bool = False):
+        self.seek(0)
+        self.truncate()
+
+    def close(self):
+        if self._auto:
+            self._auto = False
+            self.sink.commit(self)
+        # The buffer is kept, and released with the member.
+
+
+class ArchiveSink:
+    """Sequential writer of output files into a single tar or zip archive.
+
+    Members are appended in the commit order under a lock, so the outputs of the main
+    loop and a background writer can share the sink.
+
+    Attributes:
+        file: The archive file.
+        level: The compression level.
+    """
+
+    def __init__(self, file, level: int = None):
+        self.file: Path = Path(file)
+        self.level: int = level
+        self._lock = threading.Lock()
+        self._tar = None
+        self._zip = None
+        comp = _archives[archive_type(file)]
+        if comp is None:
+            kw = {} if level is None else {"compresslevel": level}
+            self._zip = zipfile.ZipFile(self.file, "w", zipfile.ZIP_DEFLATED, **kw)
+        else:
+            kw = {}
+            if level is not None and comp != "":
+                kw = {"preset" if comp == "xz" else "compresslevel": level}
+            self._tar = tarfile.open(self.file, "w:" + comp, **kw)
+
+    def member(self, name: str) -> ArchiveMember:
+        """A member buffer to be added by ``commit``."""
+        return ArchiveMember(self, name)
+
+    def open(self, name: str) -> ArchiveMember:
+        """A member buffer added on ``close``, for side files."""
+        return ArchiveMember(self, name, autocommit=True)
+
+    def add(self, name: str, data: bytes):
+        """Append a member."""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.writestr(name, data)
+                return
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def add_file(self, path, name: str = None):
+        """Append a file on disk as a member."""
+        self.add(Path(path).name if name is None else name, Path(path).read_bytes())
+
+    def commit(self, member: ArchiveMember) -> bytes:
+        """Append a member buffer, compressed by the codec of its name suffix if any.
+
+        Returns:
+            The bytes of the member in the archive.
+        """
+        data = member.getvalue()
+        suffix = split_suffix(member.name)[1]
+        codec = codecs.get(suffix)
+        if codec is not None:
+            kw = {}
+            if codec.__name__ == "lzma":
+                if suffix == ".lzma":
+                    kw["format"] = codec.FORMAT_ALONE
+                if self.level is not None:
+                    kw["preset"] = self.level
+            elif self.level is not None:
+                kw["compresslevel"] = self.level
+            data = codec.compress(data, **kw)
+        self.add(member.name, data)
+        return data
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+            if self._tar is not None:
+                self._tar.close()
+
+
+class ArchiveSource:
+    """Sequential reader of the members of a tar or zip archive matching a pattern.
+
+    Tar archives are read as a stream, so each member is read once in the archive order.
+    Compressed members (e.g. '.xyz.gz') are decompressed, keeping their names.
+
+    Attributes:
+        file: The archive file.
+        pattern: A ``fnmatch`` pattern of the member paths.
+    """
+
+    def __init__(self, file, pattern: str = "*"):
+        self.file: Path = Path(file)
+        self.pattern: str = pattern
+
+    def _member(self, name: str, data: bytes) -> ArchiveMember:
+        codec = codecs.get(split_suffix(name)[1])
+        if codec is not None:
+            data = codec.decompress(data)
+        ret = ArchiveMember(self, name)
+        ret.write(data)
+        ret.seek(0)
+        return ret
+
+    def __iter__(self):
+        if _archives[archive_type(self.file)] is None:
+            with zipfile.ZipFile(self.file) as zf:
+                for zi in zf.infolist():
+                    if zi.is_dir() or not fnmatch.fnmatchcase(zi.filename, self.pattern):
+                        continue
+                    yield self._member(zi.filename, zf.read(zi))
+            return
+        with tarfile.open(self.file, "r|*") as tf:
+            for ti in tf:
+                if not ti.isfile() or not fnmatch.fnmatchcase(ti.name, self.pattern):
+                    continue
+                yield self._member(ti.name, tf.extractfile(ti).read())
@@ -0,0 +1,69 @@
+"""
+Background writer thread with a bounded queue.
+"""
+
+import queue
+import threading
+
+
+class AsyncWriter:
+    """Run write tasks in order on a background thread.
+
+    ``submit`` blocks while ``maxsize`` tasks are pending, so reading and processing the
+    next frames overlap with writing the previous ones without holding unbounded frames.
+    An exception raised in a task is raised again in the caller at the next ``submit``,
+    ``wait`` or ``close``, as a ``RuntimeError`` naming the output of the failed task,
+    and the remaining tasks are skipped.
+
+    Attributes:
+        maxsize: The maximum number of pending tasks.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize: int = maxsize
+        self._q = queue.Queue(maxsize)
+        self._err = None
+        self._raised = False
+        self._th = threading.Thread(target=self._run, name="aseconv-writer", daemon=True)
+        self._th.start()
+
+    def _run(self):
+        while True:
+            task = self._q.get()
+            try:
+                if task is None:
+                    return
+                if self._err is None:
+                    name, func, args, kwargs = task
+                    func(*args, **kwargs)
+            except BaseException as e:
+                self._err = (name, e)
+            finally:
+                self._q.task_done()
+
+    def _check(self):
+        if self._err is not None and not self._raised:
+            self._raised = True
+            name, e = self._err
+            raise RuntimeError(f"writing '{name}' failed") from e
+
+    def submit(self, name: str, func, *args, **kwargs):
+        """Queue ``func(*args, **kwargs)``, blocking while the queue is full.
+
+        Args:
+            name: The output written by the task, reported if it fails.
+        """
+        self._check()
+        self._q.put((name, func, args, kwargs))
+
+    def wait(self):
+        """Wait until all the queued tasks are done."""
+        self._q.join()
+        self._check()
+
+    def close(self):
+        """Finish the queued tasks and stop the thread."""
+        if self._th.is_alive():
+            self._q.put(None)
+            self._th.join()
+        self._check()
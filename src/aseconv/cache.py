@@ -0,0 +1,250 @@
+"""
+Persistent on-disk caches for aseconv.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+
+
+def file_hash(file: str, bufsize: int = 1 << 20) -> str:
+    """Calculate the sha256 hash of a file content.
+
+    Args:
+        file: A file name or an in-memory file such as ``io.BytesIO``.
+        bufsize: A read buffer size.
+
+    Returns:
+        The hex digest of the file content.
+    """
+    h = hashlib.sha256()
+    if hasattr(file, "getvalue"):  # in-memory files
+        h.update(file.getvalue())
+        return h.hexdigest()
+    with open(file, "rb") as f:
+        while True:
+            buf = f.read(bufsize)
+            if not buf:
+                break
+            h.update(buf)
+    return h.hexdigest()
+
+
+def versions() -> str:
+    """Version string of aseconv and ASE used for cache keys."""
+    import ase
+
+    try:
+        from importlib.metadata import version
+
+        aver = version("compmat-aseconv")
+    except Exception:
+        aver = "unknown"
+    return f"aseconv-{aver}/ase-{ase.__version__}"
+
+
+class DiskCache:
+    """Size-bounded LRU cache of files under a directory.
+
+    Entries are stored as ``root/kk/key.suffix``. The modification time of an entry is
+    updated on every hit, and the least recently used entries are removed when the total
+    size exceeds ``maxbytes``.
+
+    Attributes:
+        root: The cache directory.
+        maxbytes: The maximum total size in bytes. 0 or negative for unlimited.
+    """
+
+    def __init__(self, root: str, maxbytes: int = 0):
+        self.root: Path = Path(root)
+        self.maxbytes: int = maxbytes
+        self._size: int = -1
+
+    def path(self, key: str, suffix: str = "") -> Path:
+        """The entry path of a ``key``."""
+        return self.root.joinpath(key[:2], key + suffix)
+
+    def get(self, key: str, suffix: str = "") -> Path:
+        """Look up an entry and mark it as recently used.
+
+        Returns:
+            The entry path, or None if not cached.
+        """
+        p = self.path(key, suffix)
+        try:
+            os.utime(p)
+        except OSError:
+            return None
+        return p
+
+    def put(self, key: str, suffix: str, src: str) -> Path:
+        """Copy a file ``src`` into the cache.
+
+        Returns:
+            The entry path.
+        """
+        p = self.path(key, suffix)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, p)
+        self._added(p)
+        return p
+
+    def put_bytes(self, key: str, suffix: str, data: bytes) -> Path:
+        """Store ``data`` into the cache.
+
+        Returns:
+            The entry path.
+        """
+        p = self.path(key, suffix)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+        self._added(p)
+        return p
+
+    def _entries(self) -> list:
+        ret = []
+        if not self.root.is_dir():
+            return ret
+        for d in self.root.iterdir():
+            if not d.is_dir():
+                continue
+            for f in d.iterdir():
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                ret.append((st.st_mtime, st.st_size, f))
+        return ret
+
+    def _added(self, p: Path):
+        if self.maxbytes <= 0:
+            return
+        if self._size < 0:
+            self._size = sum(x[1] for x in self._entries())
+        else:
+            self._size += p.stat().st_size
+        if self._size > self.maxbytes:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the size is under ``maxbytes``."""
+        entries = sorted(self._entries(), key=lambda x: x[0])
+        size = sum(x[1] for x in entries)
+        for _, fsize, f in entries:
+            if size <= self.maxbytes:
+                break
+            try:
+                f.unlink()
+                size -= fsize
+            except OSError:
+                pass
+        self._size = size
+
+
+class ResultCache(DiskCache):
+    """Content-addressed cache of converted output files.
+
+    The key is made of the input content hash, the ordered option list,
+    the output format and the aseconv/ASE versions.
+    """
+
+    def key(self, pfile: str, opts: str, otype: str, fhash: str = None) -> str:
+        """Calculate the cache key of a conversion.
+
+        Args:
+            pfile: An input file name.
+            opts: A string of the ordered options.
+            otype: An output format.
+            fhash: The content hash of ``pfile`` if already known.
+
+        Returns:
+            The cache key.
+        """
+        if fhash is None:
+            fhash = file_hash(pfile)
+        h = hashlib.sha256()
+        for x in (fhash, opts, otype, versions()):
+            h.update(x.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def materialize(self, key: str, suffix: str, ofile: Path) -> bool:
+        """Hardlink (or copy) a cached entry to ``ofile``.
+
+        Returns:
+            True if ``ofile`` was created from the cache, False for a miss.
+        """
+        p = self.get(key, suffix)
+        if p is None:
+            return False
+        ofile.unlink(missing_ok=True)
+        try:
+            os.link(p, ofile)
+        except OSError:
+            shutil.copyfile(p, ofile)
+        return True
+
+
+def _json_default(obj):
+    import numpy as np
+
+    if isinstance(obj, np.ndarray):
+        return {"__ndarray__": obj.tolist(), "dtype": obj.dtype.str}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Not JSON serializable: {type(obj)}")
+
+
+def _json_hook(d):
+    if "__ndarray__" in d:
+        import numpy as np
+
+        return np.array(d["__ndarray__"], dtype=d["dtype"])
+    return d
+
+
+class JsonCache(DiskCache):
+    """Cache of JSON documents such as symmetry and k-path results.
+
+    ``numpy`` arrays in the documents are restored as arrays, and tuples as lists.
+    """
+
+    SUFFIX = ".json"
+
+    def key(self, *items) -> str:
+        """Calculate the cache key of ``items`` with the aseconv/ASE versions."""
+        h = hashlib.sha256()
+        for x in (*items, versions()):
+            h.update(str(x).encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get_json(self, key: str):
+        """Load a cached document.
+
+        Returns:
+            The document, or None if not cached or broken.
+        """
+        p = self.get(key, self.SUFFIX)
+        if p is None:
+            return None
+        try:
+            with open(p) as f:
+                return json.load(f, object_hook=_json_hook)
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, key: str, doc) -> Path:
+        """Store a document.
+
+        Returns:
+            The entry path.
+        """
+        data = json.dumps(doc, default=_json_default).encode()
+        return self.put_bytes(key, self.SUFFIX, data)
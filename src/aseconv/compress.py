@@ -0,0 +1,60 @@
+"""
+Streaming compression codecs for input and output files.
+"""
+
+import os
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+# Codec modules by the compression suffixes
+codecs = {".gz": gzip, ".bz2": bz2, ".xz": lzma, ".lzma": lzma}
+
+
+def split_suffix(file) -> tuple:
+    """Split the compression suffix of a file name.
+
+    Args:
+        file: A file name, or a file-like object with ``name``.
+
+    Returns:
+        A ``tuple`` containing
+
+         - base (pathlib.Path): The file name without the compression suffix.
+         - suffix (str): The compression suffix such as '.gz', or '' if not compressed.
+    """
+    if not isinstance(file, (str, os.PathLike)):  # file-like objects
+        file = file.name
+    p = Path(file)
+    if p.suffix.lower() in codecs:
+        return p.with_suffix(""), p.suffix.lower()
+    return p, ""
+
+
+def copen(file, mode: str = "rb", level: int = None):
+    """Open a file, streaming through the codec of its compression suffix.
+
+    Args:
+        file: A file name.
+        mode: A file mode as in ``open``.
+        level: The compression level for writing (gz/bz2: 1-9, xz: 0-9).
+            None for the codec default.
+
+    Returns:
+        The file object.
+    """
+    _, suffix = split_suffix(file)
+    codec = codecs.get(suffix)
+    if codec is None:
+        return open(file, mode)
+    kw = {}
+    if "r" not in mode:
+        if codec is lzma:
+            if level is not None:
+                kw["preset"] = level
+            if suffix == ".lzma":
+                kw["format"] = lzma.FORMAT_ALONE
+        elif level is not None:
+            kw["compresslevel"] = level
+    return codec.open(file, mode, **kw)
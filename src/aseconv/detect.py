@@ -0,0 +1,79 @@
+"""
+Cached input format detection.
+"""
+
+import re
+import threading
+from pathlib import Path
+import ase.io.formats as afmt
+from aseconv.compress import copen
+
+# Bytes of text files, for the binary check of the leading bytes
+_textchars = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+
+
+def name_pattern(file) -> str:
+    """File name with the digit runs normalized, e.g. 'POSCAR_012' -> 'POSCAR_#'."""
+    return re.sub(r"\d+", "#", Path(file).name)
+
+
+def signature(head: bytes) -> bytes:
+    """Magic signature of the leading bytes: the first 8 bytes of binary files, or b'text'."""
+    if len(head.translate(None, _textchars)) > 0:
+        return head[:8]
+    return b"text"
+
+
+class FormatResolver:
+    """Input format detection cached per (directory, name pattern, magic signature).
+
+    ASE sniffs the format of a file by its name and contents. A homogeneous directory
+    (e.g. ``POSCAR_001``, ``POSCAR_002``, ...) is sniffed once, and the format is
+    reused for the files of the same key. Only the leading bytes are read for the key.
+
+    Attributes:
+        nhead: The number of the leading bytes for the signature.
+        hits: The number of the cached resolutions.
+        misses: The number of the sniffed resolutions.
+    """
+
+    def __init__(self, nhead: int = 64):
+        self.nhead: int = nhead
+        self.hits: int = 0
+        self.misses: int = 0
+        self._fmts = {}
+        self._lock = threading.Lock()
+
+    def key(self, file) -> tuple:
+        """Cache key of a file."""
+        with copen(file, "rb") as f:
+            head = f.read(self.nhead)
+        p = Path(file)
+        return (str(p.parent.resolve()), name_pattern(p), signature(head))
+
+    def resolve(self, file) -> tuple:
+        """Resolve the format of a file.
+
+        Returns:
+            A ``tuple`` containing
+
+             - format (str): The ASE format name.
+             - cached (bool): True if resolved by the cache.
+        """
+        key = self.key(file)
+        with self._lock:
+            fmt = self._fmts.get(key)
+            if fmt is not None:
+                self.hits += 1
+                return fmt, True
+        fmt = afmt.filetype(str(file))
+        with self._lock:
+            self.misses += 1
+            self._fmts[key] = fmt
+        return fmt, False
+
+    def invalidate(self, file):
+        """Forget the format of the key of a file, e.g. when reading with it failed."""
+        key = self.key(file)
+        with self._lock:
+            self._fmts.pop(key, None)
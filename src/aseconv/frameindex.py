@@ -0,0 +1,157 @@
+"""
+Sidecar frame-offset index for multi-frame text trajectories.
+"""
+
+import os
+import io
+import hashlib
+import numpy as np
+from pathlib import Path
+from aseconv.pluginbase import AsecIO
+
+
+def _scan_xyz(buf) -> list:
+    """Frame starts of (ext)xyz: a count line, a comment line and the atom lines."""
+    offs = []
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        line = buf[pos : end if end >= 0 else size].strip()
+        if len(line) == 0:  # trailing blank lines
+            pos = size if end < 0 else end + 1
+            continue
+        offs.append(pos)
+        pos = AsecIO.skip_lines(buf, pos, int(line.split()[0]) + 2)
+    return offs
+
+
+def _scan_tag(tag: bytes):
+    """Frame starts of formats whose frames begin with a ``tag`` line."""
+
+    def scan(buf) -> list:
+        offs = []
+        pos = buf.find(tag)
+        while pos >= 0:
+            offs.append(pos)
+            pos = buf.find(b"\n" + tag, pos + len(tag))
+            if pos >= 0:
+                pos += 1
+        return offs
+
+    return scan
+
+
+class FrameIndex:
+    """Byte-offset index of frame starts in a multi-frame text file.
+
+    The index is stored next to the file as ``.name.aseidx``, or under ``cachedir/findex``
+    when the directory is not writable, and validated by the file size and mtime.
+
+    Attributes:
+        file: The trajectory file.
+        cachedir: The cache directory for unwritable locations.
+    """
+
+    SUFFIX = ".aseidx"
+    scanners = {
+        "xyz": _scan_xyz,
+        "extxyz": _scan_xyz,
+        "lammps-dump": _scan_tag(b"ITEM: TIMESTEP"),
+        "lammps-dump-text": _scan_tag(b"ITEM: TIMESTEP"),
+    }
+    # Loaded indices keyed by (file, format)
+    _loaded = {}
+
+    def __init__(self, file: str, cachedir: str = None):
+        self.file: Path = Path(file).resolve()
+        if cachedir is None:
+            cachedir = os.environ.get("ASEC_CACHE_DIR", None)
+        self.cachedir: str = cachedir
+
+    @classmethod
+    def supports(cls, fmt: str) -> bool:
+        """Whether the format ``fmt`` can be indexed."""
+        return fmt in cls.scanners
+
+    @classmethod
+    def scan(cls, fmt: str, buf) -> np.ndarray:
+        """Frame start offsets of a buffer followed by its size, without an index file."""
+        return np.array(cls.scanners[fmt](buf) + [len(buf)], dtype=np.int64)
+
+    def _sidecars(self) -> list:
+        ret = [self.file.with_name("." + self.file.name + self.SUFFIX)]
+        if self.cachedir is not None:
+            key = hashlib.sha1(str(self.file).encode()).hexdigest()
+            ret.append(Path(self.cachedir).joinpath("findex", key + self.SUFFIX))
+        return ret
+
+    def _load(self, fmt: str, stat: tuple) -> np.ndarray:
+        for p in self._sidecars():
+            try:
+                with np.load(p) as d:
+                    if str(d["fmt"]) == fmt and tuple(d["stat"]) == stat:
+                        return d["offsets"]
+            except (OSError, ValueError, KeyError):
+                continue
+        return None
+
+    def _save(self, fmt: str, stat: tuple, offs: np.ndarray):
+        for p in self._sidecars():
+            try:
+                p.parent.mkdir(parents=True, exist_ok=True)
+                tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
+                with open(tmp, "wb") as f:
+                    np.savez(f, fmt=fmt, stat=np.array(stat), offsets=offs)
+                os.replace(tmp, p)
+                return
+            except OSError:
+                continue
+
+    def offsets(self, fmt: str, buf=None) -> np.ndarray:
+        """Frame start offsets, building and saving the index if needed.
+
+        Args:
+            fmt: The file format.
+            buf: The mapped buffer of the file, if already opened.
+
+        Returns:
+            The array of the frame start offsets followed by the (decompressed) data size.
+        """
+        st = self.file.stat()
+        stat = (st.st_size, st.st_mtime_ns)
+        key = (str(self.file), fmt)
+        ent = self._loaded.get(key)
+        if ent is not None and ent[0] == stat:
+            return ent[1]
+        offs = self._load(fmt, stat)
+        if offs is None:
+            if buf is None:
+                with AsecIO.mapfile(self.file) as mbuf:
+                    offs = self.scan(fmt, mbuf)
+            else:
+                offs = self.scan(fmt, buf)
+            self._save(fmt, stat, offs)
+        self._loaded[key] = (stat, offs)
+        return offs
+
+    def read(self, fmt: str, index, **kwargs) -> list:
+        """Read only the frames selected by ``index`` using ``ase.io.read``.
+
+        Args:
+            fmt: The file format.
+            index: An ``ase.io.read`` style index.
+            kwargs: Keyword arguments for ``ase.io.read``.
+
+        Returns:
+            The list of the selected frames.
+        """
+        import ase.io
+
+        with AsecIO.mapfile(self.file) as buf:
+            offs = self.offsets(fmt, buf)
+            ret = []
+            for i in AsecIO.select_frames(range(len(offs) - 1), index):
+                chunk = buf[offs[i] : offs[i + 1]].decode()
+                ret.append(ase.io.read(io.StringIO(chunk), format=fmt, index=0, **kwargs))
+        return ret
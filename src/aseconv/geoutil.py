@@ -5,6 +5,7 @@ Geometry utilities
 import numpy as np
 from ase import Atoms
 from typing import Union
+from aseconv.log import logger
 
 
 def basis_projected_pos_sorted(atom: Atoms, insbottom: bool = False) -> tuple:
@@ -132,13 +133,13 @@ def align_slabaxistoz(atom: Atoms, sidx: int) -> Atoms:
 
     ratom = atom
     if sidx == 1 or sidx == 2:
-        print(f" - Slab axis({chr(ord('a')+sidx-1)}) is not c axis, rolling ...")
+        logger.info(" - Slab axis({}) is not c axis, rolling ...", "abc"[sidx - 1])
         if len(atom.constraints) > 0:
-            print("  | constraints are not preservered...")
+            logger.warn("  | constraints are not preservered...")
         ratom = roll_axes(atom, sidx, 3)
-    print(" - aligning c->[001] and a->[100]")
+    logger.info(" - aligning c->[001] and a->[100]")
     if len(ratom.constraints) > 0:
-        print("  | constraints is not preservered...")
+        logger.warn("  | constraints is not preservered...")
 
     cell = ratom.cell
     ralign = R.align_vectors(
@@ -188,8 +189,10 @@ def identify_slabaxis(atom: Atoms, isslabwrap: bool = False, mingap: float = 12)
             if isslabwrap and imaxgap[i] < natom - 1:
                 slen = cpar[i]
                 shift = slen - sorted_ppos[imaxgap[i] + 1][i] + 5
-                print(
-                    f" - Separated slab, shifting {shift:.3f} A in {chr(ord('a')+i)} axis ..."
+                logger.info(
+                    " - Separated slab, shifting {:.3f} A in {} axis ...",
+                    shift,
+                    "abc"[i],
                 )
                 sar = [0] * 3
                 sar[i] = shift / slen  # Projected Fractional
@@ -199,3 +202,115 @@ def identify_slabaxis(atom: Atoms, isslabwrap: bool = False, mingap: float = 12)
             break
 
     return slabidx
+
+
+def constraint_mask(atom: Atoms, warn: bool = True) -> tuple:
+    """Convert the constraints of the ``atom`` into an N x 3 fix mask.
+
+    ``FixAtoms`` fixes all the directions, and ``FixScaled`` and ``FixCartesian`` fix the masked directions.
+
+    Args:
+        atom: An atom image.
+        warn: Whether to warn atoms fixed by multiple constraints.
+
+    Returns:
+        A ``tuple`` containing
+
+         - mask (numpy.ndarray): The boolean array of (N, 3). True for fixed.
+         - unhandled (list): The names of unsupported constraints.
+    """
+    natom = atom.get_global_number_of_atoms()
+    mask = np.zeros((natom, 3), dtype=bool)
+    unhandled = []
+    for c in atom.constraints:
+        d = c.todict()
+        name = d["name"]
+        kw = d["kwargs"]
+        if name == "FixAtoms":
+            ind = np.asarray(kw["indices"])
+            if ind.dtype == bool:
+                ind = np.flatnonzero(ind)
+            if warn:
+                for i in ind[mask[ind].any(axis=1)]:
+                    logger.warn("[WARN] [{}] is fixed by other...", i)
+            mask[ind] = True
+        elif name in ("FixScaled", "FixCartesian"):
+            mask[np.atleast_1d(kw["a"])] = kw["mask"]
+        else:
+            unhandled.append(name)
+    return mask, unhandled
+
+
+def mask_constraints(mask: np.ndarray) -> list:
+    """Convert an N x 3 fix mask into constraints.
+
+    Fully fixed atoms become a ``FixAtoms``, and partially fixed atoms become a ``FixCartesian`` per mask pattern.
+
+    Args:
+        mask: The boolean array of (N, 3). True for fixed.
+
+    Returns:
+        The list of the constraints.
+    """
+    from ase.constraints import FixAtoms, FixCartesian
+
+    mask = np.asarray(mask, dtype=bool)
+    ret = []
+    code = mask @ np.array([1, 2, 4])
+    full = np.flatnonzero(code == 7)
+    if len(full) > 0:
+        ret.append(FixAtoms(indices=full))
+    for c in np.unique(code):
+        if c == 0 or c == 7:
+            continue
+        ind = np.flatnonzero(code == c)
+        ret.append(FixCartesian(ind, mask[ind[0]]))
+    return ret
+
+
+def structure_fingerprint(
+    atom: Atoms,
+    types=None,
+    decimals: int = 4,
+    reduce: bool = True,
+    extra=(),
+    exact: bool = False,
+) -> str:
+    """Canonical fingerprint of a structure for the symmetry caches.
+
+    Made of the species, the cell handedness, the cell and the fractional positions rounded to ``decimals``, sorted so that the atom order does not matter. With ``reduce``, the cell is Niggli reduced and represented by the cell parameters, so neither the cell setting nor the orientation matters. With ``exact``, the exact cell and positions are added, for the cached results holding a geometry derived from the structure.
+
+    Args:
+        atom: An atom image.
+        types: Species of the atoms. None for the atomic numbers.
+        decimals: Decimals of the rounded cell and fractional positions.
+        reduce: Whether to Niggli reduce the cell.
+        extra: Additional items such as ``symprec``.
+        exact: Whether to add the exact cell and positions.
+
+    Returns:
+        The hex digest of the fingerprint.
+    """
+    import hashlib
+
+    types = np.asarray(atom.numbers if types is None else types)
+    cell = atom.cell.array
+    cvec = cell
+    if reduce:
+        rcell, op = atom.cell.niggli_reduce()
+        cell = op @ cell  # Not rotated, unlike ``rcell``
+        cvec = rcell.cellpar()
+    frac = np.linalg.solve(cell.T, atom.get_positions().T).T
+    frac = np.round(np.round(frac, decimals) % 1.0, decimals) + 0.0  # no -0.0
+    order = np.lexsort((frac[:, 2], frac[:, 1], frac[:, 0], types))
+    # Mirror images have the same cell parameters and fractional positions.
+    hand = int(np.sign(np.linalg.det(atom.cell.array)))
+    h = hashlib.sha256()
+    h.update(repr((types[order].tolist(), hand, extra)).encode())
+    h.update((np.round(cvec, decimals) + 0.0).tobytes())
+    h.update(frac[order].tobytes())
+    if exact:
+        h.update(types.tobytes())
+        h.update(np.ascontiguousarray(atom.cell.array, dtype=float).tobytes())
+        h.update(np.ascontiguousarray(atom.get_positions(), dtype=float).tobytes())
+    return h.hexdigest()
@@ -0,0 +1,107 @@
+"""
+Leveled console messages and the JSON-lines record log.
+"""
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+
+
+class Logger:
+    """Console messages filtered by level, and machine-readable records.
+
+    Messages are ``str.format`` templates formatted only when printed or collected, so
+    ``--quiet`` skips building them. Warnings and errors raised in a ``collect`` block
+    are gathered per thread for the records. Records are written as one JSON object
+    per line to the sink opened by ``open``.
+
+    Attributes:
+        level: The minimum level of the printed messages.
+        sink: The opened JSON-lines file, or None.
+    """
+
+    def __init__(self):
+        self.level: int = INFO
+        self.sink = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enabled(self, level: int = INFO) -> bool:
+        """Whether the messages of the level are printed."""
+        return level >= self.level
+
+    def log(self, level: int, msg: str, *args, **kwargs):
+        """Print a message of the level, formatted by ``msg.format(*args)``.
+
+        Args:
+            level: The message level.
+            msg: The message template.
+            kwargs: Keyword args for ``print``.
+        """
+        warns = getattr(self._local, "warnings", None)
+        collect = level >= WARN and warns is not None
+        if not collect and level < self.level:
+            return
+        text = msg.format(*args) if args else msg
+        if collect:
+            warns.append(text.strip())
+        if level >= self.level:
+            print(text, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs):
+        self.log(DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        self.log(INFO, msg, *args, **kwargs)
+
+    def warn(self, msg: str, *args, **kwargs):
+        self.log(WARN, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args, **kwargs):
+        self.log(ERROR, msg, *args, **kwargs)
+
+    @contextmanager
+    def collect(self):
+        """Collect the warnings and errors of the current thread in the block.
+
+        Yields:
+            The ``list`` of the messages, empty while no sink is opened.
+        """
+        prev = getattr(self._local, "warnings", None)
+        warns = []
+        self._local.warnings = warns if self.sink is not None else None
+        try:
+            yield warns
+        finally:
+            self._local.warnings = prev
+
+    def open(self, file: str):
+        """Open the JSON-lines sink, appending to an existing file."""
+        self.close()
+        self.sink = open(file, "at")
+
+    def record(self, event: str, **fields):
+        """Write a record if the sink is opened."""
+        if self.sink is None:
+            return
+        rec = {"ts": round(time.time(), 6), "event": event}
+        rec.update(fields)
+        line = json.dumps(rec, default=str)
+        with self._lock:
+            self.sink.write(line + "\n")
+            self.sink.flush()
+
+    def close(self):
+        """Close the sink."""
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+
+
+logger = Logger()
@@ -7,12 +7,27 @@
 
 from aseconv import geoutil as gu
 from aseconv.pluginbase import AsecPlug, AsecIO
+from aseconv.cache import ResultCache
+from aseconv.manifest import ConvManifest
+from aseconv.frameindex import FrameIndex
+from aseconv.detect import FormatResolver
+from aseconv.profiler import StageProfiler
+from aseconv.log import logger, INFO, WARN
+from aseconv.metrics import ServiceMetrics
+from aseconv import startup
+from aseconv.compress import codecs, split_suffix
+from aseconv.asyncwriter import AsyncWriter
+from aseconv.archive import ArchiveSink, ArchiveSource, ArchiveMember, archive_type
 import aseconv.plugins
 
 import argparse
-import sys, os, glob, re, io
+import sys, os, glob, re, io, json
 from pathlib import Path
 import subprocess
+import tempfile
+import time
+import copy
+from contextlib import nullcontext
 
 import ase.io, ase.build
 import ase.io.formats as afmt
@@ -46,6 +61,17 @@ class AseConv:
         self._iopitypeext = {}
         self._iopiextinst = {}
         self._instios = None
+        self._formats = FormatResolver()
+        self.parser.add_argument(
+            "--startup-profile",
+            metavar="N",
+            dest="startup_profile",
+            type=int,
+            nargs="?",
+            const=30,
+            default=None,
+            help="Profile the time and memory of the imports (top N), plugin loads and parser construction in a child process.",
+        )
         self._subparsers = self.parser.add_subparsers(title="commands")
         server_desc = """\
  Simple aseconv server for faster multi processing.
@@ -86,6 +112,27 @@ class AseConv:
         parser_a.add_argument(
             "--stop", action="store_true", help="Send stop signal to the server."
         )
+        parser_a.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print the request counts, queue depth, latencies and worker status as JSON.",
+        )
+        parser_a.add_argument(
+            "--stats-file",
+            metavar="JSON",
+            dest="stats_file",
+            type=str,
+            default=None,
+            help="Dump the server stats to the file periodically.",
+        )
+        parser_a.add_argument(
+            "--stats-interval",
+            metavar="Sec",
+            dest="stats_interval",
+            type=float,
+            default=10,
+            help="Interval(s) of --stats-file dumps.",
+        )
         parser_a.set_defaults(func=self._server)
 
         self.pparser = argparse.ArgumentParser(add_help=False)
@@ -94,10 +141,14 @@ class AseConv:
             metavar="OutputFormat",
             type=str,
             required=True,
-            help="Output Format.",
+            help="Output Format. Comma-separated for multiple formats (e.g. vasp,aims,lmp).",
         )
         self.pparser.add_argument(
-            "ins", metavar="File/Dir", type=str, nargs="+", help="File/Dir of sources."
+            "ins",
+            metavar="File/Dir",
+            type=str,
+            nargs="+",
+            help="File/Dir of sources, or 'ARCHIVE::PATTERN' for the members of a tar/zip.",
         )
         self.pparser.add_argument(
             "-i", metavar="InputFormat", type=str, default=None, help="Input Format."
@@ -118,7 +169,25 @@ class AseConv:
             help="Specify frame(s) using python array slicing for multiframe format file such as `.xyz`. ",
         )
         self.pparser.add_argument(
-            "-o", metavar="Outputfile", type=str, default=None, help="Output file name."
+            "-o",
+            metavar="Outputfile",
+            type=str,
+            default=None,
+            help="Output file name. All outputs go into the archive for .tar(.gz|.bz2|.xz), .tgz, .txz, .tbz2 or .zip.",
+        )
+        self.pparser.add_argument(
+            "--compress",
+            type=str,
+            choices=[x[1:] for x in codecs if x != ".lzma"],
+            default=None,
+            help="Compress outputs. Compressed inputs are detected by the suffix.",
+        )
+        self.pparser.add_argument(
+            "--clevel",
+            metavar="Level",
+            type=int,
+            default=6,
+            help="Output compression level (gz/bz2: 1-9, xz: 0-9).",
         )
         self.pparser.add_argument(
             "--pwd",
@@ -135,6 +204,56 @@ class AseConv:
             default=-1,
             help="-1(auto), 0(non-slab), {1-3}(a-c axis).",
         )
+        self.pparser.add_argument(
+            "--cache",
+            metavar="CacheDir",
+            type=str,
+            default=os.environ.get("ASEC_CACHE_DIR", None),
+            help="Persistent result cache directory (def: `ASEC_CACHE_DIR` env).",
+        )
+        self.pparser.add_argument(
+            "--cachesize",
+            metavar="MB",
+            type=float,
+            default=1024,
+            help="Maximum cache size in MB. 0 for unlimited.",
+        )
+        self.pparser.add_argument(
+            "--wq",
+            metavar="Depth",
+            type=int,
+            default=0,
+            help="Write outputs on a background thread with a queue of the depth. 0 for synchronous writes.",
+        )
+        self.pparser.add_argument(
+            "--profile",
+            metavar="JSON",
+            type=str,
+            nargs="?",
+            const="",
+            default=None,
+            help="Profile wall/CPU time, memory and atoms per stage, file and frame. Print a summary, and dump the records to JSON if given.",
+        )
+        self.pparser.add_argument(
+            "--quiet",
+            action="store_true",
+            help="Print only warnings and errors.",
+        )
+        self.pparser.add_argument(
+            "--log-json",
+            metavar="JSONL",
+            dest="log_json",
+            type=str,
+            default=None,
+            help="Append a JSON record per file and frame (status, output, timings and warnings) to the file.",
+        )
+        self.pparser.add_argument(
+            "--watch",
+            metavar="Interval",
+            type=float,
+            default=None,
+            help="Keep polling a directory input and convert new or changed files.",
+        )
         #        self.pparser.add_argument("--aslab", action="store_true", help="Temporary")
 
         self.parser_geo = self.add_subparsers(
@@ -163,6 +282,23 @@ class AseConv:
         parser.set_defaults(func=self._main_handler, argparser=parser)
         return parser
 
+    def add_command(self, cmd: str, func, **kwargs) -> argparse.ArgumentParser:
+        """Add a standalone command of a plugin.
+
+        Args:
+            cmd: Command name.
+            func: Handler called as ``func(sargs, args)``, returning an exit code.
+            kwargs: Keywoard args for ``argparse.add_parser``
+
+        Returns:
+             Added subparser.
+        """
+        parser = self._subparsers.add_parser(
+            cmd, formatter_class=self._AsecHelpFormatter, allow_abbrev=False, **kwargs
+        )
+        parser.set_defaults(func=func)
+        return parser
+
     def add_argument(
         self,
         clplug: AsecPlug,
@@ -212,86 +348,417 @@ class AseConv:
             if mode == "pfix":
                 ret += cls.output_postfix(args, vopt)
             elif mode == "process":
-                ret = cls.process(args, ret, vopt)
+                with self._stage(args, v, len(ret)):
+                    ret = cls.process(args, ret, vopt)
+            elif mode == "opts":
+                act = args.argparser._option_string_actions[v]
+                ret.append((v, getattr(args, act.dest)))
+            elif mode == "nocache":
+                ret = ret or not cls.cacheable
 
         return ret
 
-    def _onefile(self, sargs, args, inp):
-        din = Path(inp)
-        outset = None
-
-        # searching for plugin type
-        oext = ""  # without dot
-        for type, ext in self._iopitypeext.items():
-            if args.t == type:
+    # Arguments not affecting the output content.
+    _nokey = {
+        "ins",
+        "o",
+        "f",
+        "pwd",
+        "cache",
+        "cachesize",
+        "watch",
+        "wq",
+        "profile",
+        "quiet",
+        "log_json",
+        "help",
+    }
+
+    def _optkey(self, sargs, args):
+        """Ordered option string for the result cache key."""
+        popts = self._ordered_loop(sargs, args, "opts", [])
+        pdests = set()
+        for v, _ in popts:
+            pdests.add(args.argparser._option_string_actions[v].dest)
+        gopts = []
+        for act in args.argparser._actions:
+            dest = act.dest
+            if dest in self._nokey or dest in pdests or not hasattr(args, dest):
+                continue
+            gopts.append((dest, getattr(args, dest)))
+        return repr((popts, sorted(gopts)))
+
+    def _oext(self, type, args):
+        """Output extension (without dot) of ``type``."""
+        oext = ""
+        for t, ext in self._iopitypeext.items():
+            if t == type:
                 oext = ext
                 if oext.startswith("."):
                     oext = oext[1:]
                 break
         if oext == "":
-            fmt = afmt.get_ioformat(args.t)
+            fmt = afmt.get_ioformat(type)
             if len(fmt.extensions) > 0:
                 oext = fmt.extensions[0]  # No dot
             else:
                 oext = fmt.name
+        if args.compress is not None:
+            oext += "." + args.compress
+        return oext
 
-        pfix = self._ordered_loop(sargs, args, "pfix")
-        if din.is_dir():
-            if args.o != None:
-                dp = Path(args.o)
-            else:
-                dp = din.parent.joinpath("0conv_" + args.t + "_" + din.name)
+    def _onefile(self, sargs, args, inp):
+        src = self._archive_spec(inp)
+        din = Path(inp) if src is None else src.file
+        types = args.t.split(",")
 
-            files = [
-                x
-                for x in glob.glob(str(din.joinpath("*")))
-                if Path(x).name != "desktop.ini"
-            ]
+        pfix = self._ordered_loop(sargs, args, "pfix")
+        if src is not None:
+            files = src
+        elif din.is_dir():
+            files = self._infiles(din)
         else:
-            if args.o != None:
-                dp = Path(args.o).parent
-                outset = Path(args.o)
-            else:
-                dp = din.parent
             files = [str(inp)]
 
-        dp.mkdir(parents=True, exist_ok=True)
-        args.pParent = dp
+        cache = None
+        if args.cache is not None and not self._ordered_loop(sargs, args, "nocache", False):
+            cache = ResultCache(
+                Path(args.cache).joinpath("results"), int(args.cachesize * 2**20)
+            )
 
-        for f in files:
-            pfile = Path(f)
-            if outset != None:
-                ofile = outset
+        # One target per output type, sharing the read and processed frames.
+        mans = {}
+        args.pTargets = []
+        for type in types:
+            targ = copy.copy(args)
+            targ.t = type
+            oext = self._oext(type, args)
+            outset = None
+            if args.pSink is not None:
+                dp = Path(args.o).parent
+            elif src is not None:
+                if args.o != None:
+                    dp = Path(args.o)
+                else:
+                    aname = din.name[: -len(archive_type(din))]
+                    dp = din.parent.joinpath("0conv_" + type + "_" + aname)
+            elif din.is_dir():
+                if args.o != None:
+                    dp = Path(args.o)
+                else:
+                    dp = din.parent.joinpath("0conv_" + type + "_" + din.name)
             else:
-                ofile = dp.joinpath(pfile.stem + pfix + "." + oext)
+                if args.o != None:
+                    dp = Path(args.o).parent
+                    outset = Path(args.o)
+                    if len(types) > 1:
+                        outset = outset.with_suffix("." + oext)
+                else:
+                    dp = din.parent
+
+            dp.mkdir(parents=True, exist_ok=True)
+            targ.pParent = dp
+            targ.pOutSet = outset
+            targ.pPfix = pfix
+            targ.pOext = oext
+            targ.pCache = cache
+            targ.pOptKey = self._optkey(sargs, targ)
+
+            targ.pManifest = None
+            if src is None and din.is_dir() and args.pSink is None:
+                if dp not in mans:
+                    mans[dp] = ConvManifest(dp)
+                targ.pManifest = mans[dp]
+
+            # Writers of the targets run in parallel, each in order.
+            targ.pWriter = None
+            if args.wq > 0:
+                targ.pWriter = AsyncWriter(args.wq)
+            args.pTargets.append(targ)
+        args.pManifests = list(mans.values())
+
+        try:
+            for f in files:
+                self._convfile(sargs, args, f if src is not None else Path(f))
+            if args.watch is not None:
+                if args.pSink is not None or src is not None:
+                    logger.warn("[WARN] --watch is not for an archive input/output...")
+                elif din.is_dir():
+                    self._watch(sargs, args, din)
+                else:
+                    logger.warn("[WARN] --watch is only for a directory input...")
+        finally:
+            try:
+                for targ in args.pTargets:
+                    if targ.pWriter is not None:
+                        targ.pWriter.close()
+            finally:
+                for man in args.pManifests:
+                    man.save()
+
+    @staticmethod
+    def _stage(args, name, natoms=None, pfile=None, frame=None):
+        """Profiled stage context, of the current file and frame by default."""
+        prof = args.pProfile
+        if prof is None:
+            return nullcontext()
+        if pfile is None:
+            pfile, frame = args.pInFile, args.pFrame
+        return prof.stage(name, pfile, frame, natoms)
+
+    def _submit(self, args, ofile, func, *fargs):
+        """Run ``func`` on the background writer if ``--wq`` is given, otherwise now.
+
+        ``ofile`` is the output of the task, named in the error if it fails.
+        """
+        if args.pWriter is None:
+            func(*fargs)
+        else:
+            args.pWriter.submit(ofile, func, *fargs)
+
+    def _flush(self, args):
+        """Wait for the queued writes of all targets."""
+        for targ in args.pTargets:
+            if targ.pWriter is not None:
+                targ.pWriter.wait()
+
+    def _save(self, args):
+        """Save the manifests after the queued writes."""
+        self._flush(args)
+        for man in args.pManifests:
+            man.save()
+
+    @staticmethod
+    def _archive_spec(inp):
+        """``ArchiveSource`` of an ``archive::pattern`` input, otherwise None."""
+        afile, sep, pat = str(inp).partition("::")
+        if sep == "" or archive_type(afile) is None:
+            return None
+        return ArchiveSource(afile, pat if pat != "" else "*")
+
+    def _infiles(self, din):
+        return [
+            x for x in glob.glob(str(din.joinpath("*"))) if Path(x).name != "desktop.ini"
+        ]
+
+    def _watch(self, sargs, args, din):
+        """Poll ``din`` and convert new or changed files until interrupted."""
+        self._save(args)
+        logger.info(">>> Watching '{}' every {}s (Ctrl-C to stop) ...", din, args.watch)
+        pending = {}
+        # Signatures of the files failed to convert, retried when changed
+        failed = {}
+        try:
+            while True:
+                time.sleep(args.watch)
+                for f in self._infiles(din):
+                    pfile = Path(f)
+                    try:
+                        st = pfile.stat()
+                    except OSError:
+                        continue
+                    if not pfile.is_file() or all(
+                        t.pManifest.stat_same(
+                            pfile, self._outfile(t, pfile), st, t.pOptKey
+                        )
+                        for t in args.pTargets
+                    ):
+                        pending.pop(f, None)
+                        failed.pop(f, None)
+                        continue
+                    # Converted only when unchanged since the previous poll,
+                    # so files being written are not read partially.
+                    sig = (st.st_mtime_ns, st.st_size)
+                    if failed.get(f) == sig:
+                        continue
+                    if pending.get(f) != sig:
+                        pending[f] = sig
+                        continue
+                    pending.pop(f)
+                    try:
+                        if self._convfile(sargs, args, pfile):
+                            self._save(args)
+                    except Exception as e:
+                        failed[f] = sig
+                        logger.error(
+                            "[ERR] '{}' failed ({}: {}), retried when changed...",
+                            pfile,
+                            type(e).__name__,
+                            e,
+                        )
+                        self._renew_writers(args)
+        except KeyboardInterrupt:
+            logger.info(" - Watching stopped...")
+        self._save(args)
+
+    def _renew_writers(self, args):
+        """Replace the background writers after an error, which skip the later tasks."""
+        for targ in args.pTargets:
+            if targ.pWriter is not None:
+                try:
+                    targ.pWriter.close()
+                except Exception:
+                    pass
+                targ.pWriter = AsyncWriter(args.wq)
+
+    def _outfile(self, args, pfile):
+        if args.pOutSet != None:
+            return args.pOutSet
+        stem = split_suffix(pfile)[0].stem
+        name = stem + args.pPfix + "." + args.pOext
+        if isinstance(pfile, ArchiveMember):
+            # Mirroring the member directories
+            name = str(pfile.parent.joinpath(name))
+        if args.pSink is not None:
+            return args.pSink.member(name)
+        ofile = args.pParent.joinpath(name)
+        ofile.parent.mkdir(parents=True, exist_ok=True)
+        return ofile
+
+    def _convfile(self, sargs, args, pfile):
+        """Convert a file to the outputs of all targets.
 
+        Returns:
+            True if converted, otherwise False.
+        """
+        todo = []
+        for targ in args.pTargets:
+            man = targ.pManifest
+            ofile = self._outfile(targ, pfile)
             isdev = str(ofile).startswith("/dev")
+            fhash = None
+            if man is not None and not args.f and pfile.is_file():
+                stat = man.status(pfile, ofile, targ.pOptKey)
+                if stat == "same" and ofile.exists():
+                    logger.info("[INFO] '{}' is unchanged...", pfile)
+                    self._record(targ, pfile, ofile, "unchanged")
+                    continue
+                fhash = man.lasthash
+                stat = stat != "new"
+            else:
+                stat = False
             # TODO folder type plugin
-            if not args.f and ofile.exists() and not isdev:
-                print("[INFO] '{}' exists...".format(str(ofile)))
-                continue
-            if not pfile.exists():
-                print("[ERR] No input file({}) exists...".format(str(pfile)))
+            if not args.f and not stat and ofile.exists() and not isdev:
+                logger.info("[INFO] '{}' exists...", ofile)
+                self._record(targ, pfile, ofile, "exists")
                 continue
-
-            args.pOutFile = ofile
-            args.pInFile = pfile
-
-            allatom = self._read(args, pfile)
+            todo.append((targ, ofile, isdev, fhash))
+        if len(todo) < 1:
+            return False
+        if not pfile.exists():
+            logger.error("[ERR] No input file({}) exists...", pfile)
+            logger.record("file", input=str(pfile), status="missing")
+            return False
+
+        outs = []
+        for targ, ofile, isdev, fhash in todo:
+            cache = targ.pCache
+            ckey = None
+            if cache is not None and not isdev:
+                ckey = cache.key(pfile, targ.pOptKey, targ.t, fhash)
+                ext = "." + targ.pOext
+                if args.pSink is not None:
+                    cfile = cache.get(ckey, ext)
+                    hit = cfile is not None
+                    if hit:
+                        data = cfile.read_bytes()
+                        self._submit(targ, ofile, args.pSink.add, ofile.name, data)
+                else:
+                    hit = cache.materialize(ckey, ext, ofile)
+                if hit:
+                    logger.info(" - Cached '{}'...", ofile)
+                    self._record(targ, pfile, ofile, "cached")
+                    if targ.pManifest is not None:
+                        targ.pManifest.record(pfile, targ.pOptKey, ofile, fhash)
+                    continue
+            targ.pOutFile = ofile
+            targ.pInFile = pfile
+            outs.append((targ, ofile, isdev, fhash, ckey))
+        if len(outs) < 1:
+            return True
+
+        # Plugins see the first output, and all of them in ``pOutTargets``.
+        args.pOutTargets = [x[0] for x in outs]
+        args.pOutFile = outs[0][1]
+        args.pInFile = pfile
+        args.pParent = outs[0][0].pParent
+
+        args.pFrame = None
+        t0 = time.perf_counter()
+        with logger.collect() as warns:
+            try:
+                with self._stage(args, "read") as rec:
+                    allatom = self._read(args, pfile)
+                    if rec is not None:
+                        rec["natoms"] = sum(len(x) for x in allatom)
+            except Exception as e:
+                logger.record(
+                    "file",
+                    input=str(pfile),
+                    status="error",
+                    error=f"{type(e).__name__}: {e}",
+                    warnings=warns,
+                )
+                raise
+        logger.record(
+            "file",
+            input=str(pfile),
+            status="read",
+            nframes=len(allatom),
+            read=time.perf_counter() - t0,
+            warnings=warns,
+        )
+        for targ, ofile, isdev, _, _ in outs:
             if ofile != pfile and not isdev:
-                ofile.unlink(missing_ok=True)
-            # global args.Gslabidx
-            outatoms = []
-            for atom in allatom:
+                self._submit(targ, ofile, ofile.unlink, True)
+        # global args.Gslabidx
+        for iframe, atom in enumerate(allatom):
+            args.pFrame = iframe
+            t0 = time.perf_counter()
+            with logger.collect() as warns:
                 slabidx = args.sidx
                 if slabidx < 0:
-                    slabidx = gu.identify_slabaxis(atom)
+                    with self._stage(args, "slabaxis", len(atom)):
+                        slabidx = gu.identify_slabaxis(atom)
                 args.SlabIdx = slabidx
                 atom = self._ordered_loop(sargs, args, "process", atom)
-                self._write(args, atom, ofile)
+            tproc = time.perf_counter() - t0
+            for i, (targ, ofile, _, _, _) in enumerate(outs):
+                # Writers may modify the frame (e.g. constraints), so others get copies.
+                tatom = atom if i == len(outs) - 1 else atom.copy()
+                fargs = (targ, tatom, ofile, pfile, iframe, tproc, warns)
+                self._submit(targ, ofile, self._write_frame, *fargs)
+
+        for targ, ofile, _, fhash, ckey in outs:
+            self._submit(targ, ofile, self._done, targ, pfile, ofile, fhash, ckey)
+        return True
+
+    @staticmethod
+    def _record(args, pfile, ofile, status):
+        """Record a file not converted by a target."""
+        logger.record(
+            "file", input=str(pfile), type=args.t, output=str(ofile), status=status
+        )
+
+    def _done(self, args, pfile, ofile, fhash, ckey):
+        """Commit, cache and record a written output."""
+        cache = args.pCache
+        ext = "." + args.pOext
+        if args.pSink is not None:
+            data = args.pSink.commit(ofile)
+            if ckey is not None:
+                cache.put_bytes(ckey, ext, data)
+            return
+        if ckey is not None and ofile.exists():
+            cache.put(ckey, ext, ofile)
+        if args.pManifest is not None:
+            args.pManifest.record(pfile, args.pOptKey, ofile, fhash)
+
+    # Formats by extensions taken without sniffing when `-i` is not given
+    _idxext = {".xyz": "extxyz", ".extxyz": "extxyz"}
 
     def _read(self, args, pfile):
-        ext = pfile.suffix
+        ext = split_suffix(pfile)[0].suffix
         type = args.i
         defkwargs = {"index": args.frame, "do_not_split_by_at_sign": True}
         if type is not None:
@@ -303,16 +770,61 @@ class AseConv:
                 cls = self._iopiextinst[ext]
                 return cls.read(pfile, type, **defkwargs)
 
-        return ase.io.read(pfile, format=type, **defkwargs)
+        if isinstance(pfile, ArchiveMember):
+            return AsecIO.read_member(pfile, type, **defkwargs)
+        cached = False
+        if type is None:
+            type = self._idxext.get(ext)
+        if type is None:
+            type, cached = self._formats.resolve(pfile)
+        try:
+            return self._read_ase(args, pfile, type, defkwargs)
+        except Exception:
+            if not cached:
+                raise
+            # A file of the same name pattern in another format
+            self._formats.invalidate(pfile)
+            type, _ = self._formats.resolve(pfile)
+            return self._read_ase(args, pfile, type, defkwargs)
+
+    def _read_ase(self, args, pfile, type, kwargs):
+        if args.frame != ":" and FrameIndex.supports(type):
+            return FrameIndex(pfile, args.cache).read(
+                type, args.frame, do_not_split_by_at_sign=True
+            )
+        return ase.io.read(pfile, format=type, **kwargs)
+
+    def _write_frame(self, args, atom, ofile, pfile, frame, tproc=0.0, pwarns=()):
+        """Write a processed frame, and record it with the timings and warnings."""
+        natoms = len(atom)
+        rec = {"status": "ok"}
+        t0 = time.perf_counter()
+        with logger.collect() as warns:
+            try:
+                with self._stage(args, "write:" + args.t, natoms, pfile, frame):
+                    self._write(args, atom, ofile)
+            except Exception as e:
+                rec = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+                raise
+            finally:
+                logger.record(
+                    "frame",
+                    input=str(pfile),
+                    frame=frame,
+                    type=args.t,
+                    output=str(ofile),
+                    natoms=natoms,
+                    process=tproc,
+                    write=time.perf_counter() - t0,
+                    warnings=list(pwarns) + warns,
+                    **rec,
+                )
 
     def _write(self, args, atom, ofile, log=True):
         type = args.t
-        if log:
-            print(
-                " - Writing [{}] '{}'...".format(
-                    atom.get_chemical_formula(), str(ofile)
-                )
-            )
+        if log and logger.enabled(INFO):
+            # The formula is built only for the printed message.
+            logger.info(" - Writing [{}] '{}'...", atom.get_chemical_formula(), ofile)
         # if (args.noconst):
         # 	atom.set_constraint(None)
         if type in self._iopitypeinst:
@@ -322,28 +834,73 @@ class AseConv:
         parm = {}
         if type == "vasp":
             parm = {"direct": not args.C, "wrap": False}
+        fmt = afmt.get_ioformat(type)
+        if isinstance(ofile, ArchiveMember):
+            if fmt.acceptsfd:
+                with AsecIO.fopen(ofile, "wb" if fmt.isbinary else "wt") as f:
+                    return ase.io.write(f, atom, format=type, **parm)
+            # Written to a scratch file for the writers taking only file names
+            with tempfile.TemporaryDirectory(dir=args.pParent) as td:
+                tfile = Path(td).joinpath(ofile.name)
+                ase.io.write(tfile, atom, format=type, **parm)
+                ofile.write(tfile.read_bytes())
+            return
+        if split_suffix(ofile)[1] != "" and fmt.acceptsfd:
+            mode = "wb" if fmt.isbinary else "wt"
+            with AsecIO.fopen(ofile, mode, args.clevel) as f:
+                return ase.io.write(f, atom, format=type, **parm)
         ase.io.write(ofile, atom, format=type, **parm)
 
     def _main_handler(self, sargs, args):
         # lmpfix=self.read_fix(args)
-        for i in args.ins:
-            print(f">>> Globbing '{i}' ...")
-            f = glob.glob(i)
-            if len(f) < 1:
-                print(f" - No file in '{i}/' ...")
-                return 1
-
-            for j in f:
-                if len(f) > 1:
-                    print(" ====")
-                print(" > Processing '{}'...".format(j))
-                self._onefile(sargs, args, j)  # ,lmpfix)
+        args.pSink = None
+        args.pProfile = None
+        args.pInFile = None
+        args.pFrame = None
+        if args.profile is not None:
+            args.pProfile = StageProfiler()
+        logger.level = WARN if args.quiet else INFO
+        if args.log_json is not None:
+            logger.open(args.log_json)
+        if args.o is not None and archive_type(args.o) is not None:
+            Path(args.o).parent.mkdir(parents=True, exist_ok=True)
+            args.pSink = ArchiveSink(args.o, args.clevel)
+            logger.info(">>> Writing outputs into '{}' ...", args.o)
+        try:
+            for i in args.ins:
+                logger.info(">>> Globbing '{}' ...", i)
+                afile, sep, pat = i.partition("::")
+                if sep != "" and archive_type(afile) is not None:
+                    f = [x + sep + pat for x in glob.glob(afile)]
+                else:
+                    f = glob.glob(i)
+                if len(f) < 1:
+                    logger.error(" - No file in '{}/' ...", i)
+                    return 1
+
+                for j in f:
+                    if len(f) > 1:
+                        logger.info(" ====")
+                    logger.info(" > Processing '{}'...", j)
+                    self._onefile(sargs, args, j)  # ,lmpfix)
+        finally:
+            if args.pSink is not None:
+                args.pSink.close()
+            if args.pProfile is not None:
+                args.pProfile.stop()
+                args.pProfile.print_summary()
+                if args.profile != "":
+                    args.pProfile.save(args.profile)
+            logger.close()
+            logger.level = INFO
         return 0
 
     def _plug_update_warn(self, type, ext, inst):
         if type in self._iopitypeinst:
-            print(
-                f"[WARN] '{type}' is already registered to {self._iopitypeinst[type]}..."
+            logger.warn(
+                "[WARN] '{}' is already registered to {}...",
+                type,
+                self._iopitypeinst[type],
             )
         self._iopitypeinst.update({type: inst})
         self._iopiextinst.update({ext: inst})
@@ -363,7 +920,12 @@ class AseConv:
                 req = self.request
                 msg = str(req.recv(4096), "ascii")
                 req.settimeout(0)
-                if msg != "":
+                if msg == "stats":
+                    # Answered here, so while the worker is busy as well.
+                    stats = json.dumps(self.mainself.metrics.snapshot())
+                    req.sendall(bytes(stats + "\n", "ascii"))
+                elif msg != "":
+                    self.mainself.metrics.received()
                     self.mainself.qmsg.put(msg)
                     ret = self.mainself.qret.get(msg)
                     response = bytes(ret + "\n", "ascii")
@@ -373,6 +935,23 @@ class AseConv:
         port = args.port
         deftimeout = args.timeout
 
+        if args.stats:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as soc:
+                try:
+                    soc.connect(("localhost", port))
+                    soc.sendall(b"stats")
+                    data = b""
+                    while True:
+                        chunk = soc.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                except OSError:
+                    print(" - ## No server is running...")
+                    sys.exit(1)
+            print(json.dumps(json.loads(data), indent=1))
+            sys.exit(0)
+
         if args.stop:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as soc:
                 try:
@@ -396,6 +975,10 @@ class AseConv:
 
         self.qmsg = queue.Queue()
         self.qret = queue.Queue()
+        self.metrics = ServiceMetrics(self.qmsg, deftimeout)
+        stopdump = None
+        if args.stats_file is not None:
+            stopdump = self.metrics.dump_every(args.stats_file, args.stats_interval)
 
         # server.daemon_threads=True
         socketserver.TCPServer.allow_reuse_address = True
@@ -412,23 +995,33 @@ class AseConv:
             server_thread.start()
             timeout = deftimeout
             while True:
+                self.metrics.idle(timeout)
                 try:
                     msg = self.qmsg.get(timeout=1)
-                    timeout = deftimeout
-                    spm = shlex.split(msg)
-                    print(f" - ## Requested args: {msg}")
-                    if spm[0] == "stop":
+                except queue.Empty:
+                    timeout -= 1
+                    if timeout <= 0:
                         break
+                    continue
+                except KeyboardInterrupt:
+                    break
+                timeout = deftimeout
+                print(f" - ## Requested args: {msg}")
+                key = (msg.split() or [""])[0]
+                if key == "stop":
+                    break
+                status = "error"
+                t0 = time.perf_counter()
+                self.metrics.start(msg)
+                try:
+                    spm = shlex.split(msg)
                     hargs = self.parser.parse_args(spm)
+                    key = self._plugset(spm, hargs)
                     if hargs.pwd == "":
                         os.chdir(hargs.pwd)
                     ret = hargs.func(spm, hargs)
+                    status = "ok" if not ret else "failed"
                     self.qret.put(str(ret))
-                except queue.Empty:
-                    timeout -= 1
-                    if timeout <= 0:
-                        break
-                    continue
                 except KeyboardInterrupt:
                     break
                 except argparse.ArgumentError:
@@ -439,14 +1032,26 @@ class AseConv:
                     self.qret.put(str(1))
                     print("Unexpected error:", sys.exc_info()[0])
                     # traceback.print_exc()
+                finally:
+                    self.metrics.finish(key, time.perf_counter() - t0, status)
 
             # print(dir(server))
             # server.shutdown()
             # print(" - ## aseconv server was closed...")
             self.qret.put(str(0))
+        if stopdump is not None:
+            stopdump.set()
+            self.metrics.save(args.stats_file)
         print(" - ## aseconv server was closed...")
         sys.exit(0)
 
+    def _plugset(self, sargs, args) -> str:
+        """Command and the plugin options of a request, e.g. 'geo --kp --sel'."""
+        prog = getattr(args, "argparser", None)
+        dplugs = self._plugins.get(prog.prog, {}) if prog is not None else {}
+        opts = {v for v in sargs if v.startswith("-") and v.lstrip("-") in dplugs}
+        return " ".join([sargs[0]] + sorted(opts))
+
     def init_parser(self, iaio: AsecIO):
         """Initializer parser.
 
@@ -498,6 +1103,8 @@ class AseConv:
 
         try:
             args = self.parser.parse_args()
+            if args.startup_profile is not None:
+                sys.exit(startup.run(args.startup_profile))
             if len(sys.argv) == 1:
                 self.parser.print_help()
                 sys.exit(1)
@@ -521,7 +1128,8 @@ def acmparser():
     if ascparser is not None:
         return ascparser
 
-    asp = AseConv()
+    with startup.measure("parser", "AseConv()"):
+        asp = AseConv()
 
     class NoPlugMain(AsecPlug):
         def process(self, atom):
@@ -535,7 +1143,8 @@ def acmparser():
     inst.init_plugins(asp)
     iaio = NoPlugIO()
     iaio.init_plugins()
-    ascparser = asp.init_parser(iaio)
+    with startup.measure("parser", "init_parser()"):
+        ascparser = asp.init_parser(iaio)
     return ascparser
 
 
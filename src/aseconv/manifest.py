@@ -0,0 +1,119 @@
+"""
+Change manifest for incremental directory conversions.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from aseconv.cache import file_hash
+
+
+class ConvManifest:
+    """Manifest of converted inputs stored in an output directory.
+
+    Each output file name records the input file name with its ``mtime``, ``size`` and
+    content ``hash``, and the option set, so that re-runs only process new or changed files.
+
+    Attributes:
+        file: The manifest file.
+        entries: Records keyed by output file names.
+        lasthash: The content hash calculated by the last ``status`` call.
+    """
+
+    FILE = ".aseconv_manifest.json"
+
+    def __init__(self, dp: Path):
+        self.file: Path = Path(dp).joinpath(self.FILE)
+        self.entries: dict = {}
+        self.lasthash: str = None
+        self._dirty = False
+        try:
+            with open(self.file) as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _opthash(opts: str) -> str:
+        return hashlib.sha1(opts.encode()).hexdigest()
+
+    def _entry(self, pfile: Path, ofile: Path) -> dict:
+        ent = self.entries.get(Path(ofile).name)
+        if ent is None or ent["in"] != pfile.name:
+            return None
+        return ent
+
+    def stat_same(
+        self, pfile: Path, ofile: Path, st: os.stat_result, opts: str
+    ) -> bool:
+        """Whether ``pfile`` has the recorded ``mtime``, ``size`` and options."""
+        ent = self._entry(pfile, ofile)
+        return (
+            ent is not None
+            and ent["mtime"] == st.st_mtime_ns
+            and ent["size"] == st.st_size
+            and ent["opts"] == self._opthash(opts)
+        )
+
+    def status(self, pfile: Path, ofile: Path, opts: str) -> str:
+        """Check whether ``pfile`` was changed since the last conversion to ``ofile``.
+
+        The content hash is calculated only when ``mtime`` or ``size`` differs.
+
+        Args:
+            pfile: An input file.
+            ofile: The output file.
+            opts: A string of the option set.
+
+        Returns:
+            'new', 'same', or 'changed'.
+        """
+        self.lasthash = None
+        st = pfile.stat()
+        ent = self._entry(pfile, ofile)
+        if ent is None:
+            self.lasthash = file_hash(pfile)
+            return "new"
+        if ent["mtime"] == st.st_mtime_ns and ent["size"] == st.st_size:
+            self.lasthash = ent["hash"]
+        else:
+            self.lasthash = file_hash(pfile)
+            if self.lasthash == ent["hash"]:
+                # Touched only
+                ent.update({"mtime": st.st_mtime_ns, "size": st.st_size})
+                self._dirty = True
+        if self.lasthash != ent["hash"] or ent["opts"] != self._opthash(opts):
+            return "changed"
+        return "same"
+
+    def record(self, pfile: Path, opts: str, ofile: Path, fhash: str = None):
+        """Record a converted input file.
+
+        Args:
+            pfile: An input file.
+            opts: A string of the option set.
+            ofile: The output file.
+            fhash: The content hash of ``pfile`` if already known.
+        """
+        st = pfile.stat()
+        if fhash is None:
+            fhash = file_hash(pfile)
+        self.entries[Path(ofile).name] = {
+            "in": pfile.name,
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": fhash,
+            "opts": self._opthash(opts),
+        }
+        self._dirty = True
+
+    def save(self):
+        """Write the manifest if modified."""
+        if not self._dirty:
+            return
+        tmp = self.file.with_name(self.file.name + ".tmp")
+        with open(tmp, "wt") as f:
+            json.dump({"files": self.entries}, f, indent=1)
+        os.replace(tmp, self.file)
+        self._dirty = False
@@ -0,0 +1,172 @@
+"""
+Request metrics of the aseconv service.
+"""
+
+import os
+import json
+import time
+import threading
+
+
+class LatencyHistogram:
+    """Request latencies counted in fixed buckets.
+
+    Attributes:
+        bounds: The upper bounds (s) of the buckets, the last bucket is unbounded.
+        counts: The number of the latencies per bucket.
+    """
+
+    bounds = (0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30, 100, 300)
+
+    def __init__(self):
+        self.counts: list = [0] * (len(self.bounds) + 1)
+        self.total: float = 0.0
+        self.min: float = None
+        self.max: float = None
+
+    def add(self, sec: float):
+        i = 0
+        while i < len(self.bounds) and sec > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += sec
+        self.min = sec if self.min is None else min(self.min, sec)
+        self.max = sec if self.max is None else max(self.max, sec)
+
+    def quantile(self, q: float) -> float:
+        """Estimated ``q`` quantile, or None if empty.
+
+        The quantile is linearly interpolated within its bucket, between the bucket
+        bounds clamped to the measured minimum and maximum, so it is an estimate with
+        the resolution of the buckets, not a measured latency.
+        """
+        n = sum(self.counts)
+        if n == 0:
+            return None
+        rank = q * n
+        acc = 0
+        for i, c in enumerate(self.counts):
+            if c > 0 and acc + c >= rank:
+                lo = max(self.bounds[i - 1] if i > 0 else 0.0, self.min)
+                hi = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+                return lo + (hi - lo) * (rank - acc) / c
+            acc += c
+        return self.max
+
+    def todict(self) -> dict:
+        n = sum(self.counts)
+        buckets = {f"le_{b:g}": c for b, c in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": n,
+            "mean": self.total / n if n > 0 else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+
+class ServiceMetrics:
+    """Counters, latencies and the worker status of the service.
+
+    Requests are recorded by the worker with ``start`` and ``finish``, while
+    ``snapshot`` is taken from the socket handler threads, so the service answers
+    ``--stats`` even when the worker is busy.
+
+    Attributes:
+        queue: The request queue, for the queue depth.
+        timeout: The idle shutdown timeout (s).
+    """
+
+    def __init__(self, queue=None, timeout: int = None):
+        self.queue = queue
+        self.timeout: int = timeout
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._counts = {"received": 0, "ok": 0, "failed": 0, "error": 0}
+        self._inflight = 0
+        self._current = None
+        self._since = time.time()
+        self._idle = 0
+        self._latency = LatencyHistogram()
+        self._bykey = {}
+
+    def received(self):
+        """Count a request put into the queue."""
+        with self._lock:
+            self._counts["received"] += 1
+
+    def start(self, msg: str):
+        """Mark the worker busy with a request."""
+        with self._lock:
+            self._inflight += 1
+            self._current = msg
+            self._since = time.time()
+
+    def finish(self, key: str, sec: float, status: str):
+        """Record a finished request.
+
+        Args:
+            key: The command and the plugin set, e.g. 'geo --kp --sel'.
+            sec: The latency (s).
+            status: 'ok', 'failed' (non-zero return) or 'error' (exception).
+        """
+        with self._lock:
+            self._inflight -= 1
+            self._current = None
+            self._since = time.time()
+            self._counts[status] += 1
+            self._latency.add(sec)
+            if key not in self._bykey:
+                self._bykey[key] = LatencyHistogram()
+            self._bykey[key].add(sec)
+
+    def idle(self, left: int):
+        """Set the remaining idle seconds before the shutdown."""
+        with self._lock:
+            self._idle = left
+
+    def snapshot(self) -> dict:
+        """Current metrics as a JSON-serializable ``dict``."""
+        now = time.time()
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "uptime": now - self._started,
+                "requests": dict(self._counts),
+                "inflight": self._inflight,
+                "queue": self.queue.qsize() if self.queue is not None else 0,
+                "worker": {
+                    "status": "busy" if self._current is not None else "idle",
+                    "request": self._current,
+                    "for": now - self._since,
+                    "timeout": self.timeout,
+                    "idle_left": None if self._current is not None else self._idle,
+                },
+                "latency": self._latency.todict(),
+                "plugins": {k: v.todict() for k, v in sorted(self._bykey.items())},
+            }
+
+    def save(self, file: str):
+        """Write the snapshot as JSON, replacing the file atomically."""
+        tfile = f"{file}.tmp{os.getpid()}"
+        with open(tfile, "wt") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tfile, file)
+
+    def dump_every(self, file: str, interval: float) -> threading.Event:
+        """Save the snapshot to ``file`` every ``interval`` seconds on a thread.
+
+        Returns:
+            The ``threading.Event`` to set for stopping.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                self.save(file)
+
+        threading.Thread(target=run, name="aseconv-stats", daemon=True).start()
+        return stop
@@ -10,10 +10,17 @@ from ase import Atoms
 from abc import ABC, abstractmethod
 
 if TYPE_CHECKING:  # Only imports the below statements during type checking
+    import argparse
     from .main import AseConv
 
-import traceback
+import mmap
+from contextlib import contextmanager, nullcontext
 from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from aseconv.compress import copen, split_suffix
+from aseconv.log import logger, INFO, WARN
+from aseconv import startup
+from aseconv.archive import ArchiveMember
 
 
 class _AsecBase(ABC):
@@ -38,15 +45,19 @@ class _AsecBase(ABC):
             if cname not in cls._plugins:
                 cls._plugins.update({cname: cls})
             else:
-                print(f" - [_AsecBase]: Warn '{cname}' is duplicated...")
+                logger.warn(" - [_AsecBase]: Warn '{}' is duplicated...", cname)
 
 
 class AsecPlug(_AsecBase):
-    """Plugin base class for ``atom`` modification."""
+    """Plugin base class for ``atom`` modification.
+
+    Set ``cacheable`` to False in plugins writing side files, so that the result cache is bypassed.
+    """
 
     _plugins: OrderedDict = OrderedDict({})
     _instances: list = []
     _piinit = False
+    cacheable: bool = True
 
     def __init__(self):
         """Initializing the class.
@@ -63,13 +74,42 @@ class AsecPlug(_AsecBase):
             return
 
         for key, p in AsecPlug._plugins.items():
-            self._instances.append(p(asp))
+            with startup.measure("init", key):
+                self._instances.append(p(asp))
 
         self._piinit = True
 
-    def piprint(self, *args, **kwargs):
-        """Plugin print with ``clspre`` tag."""
-        print(f" - [{self.clspre}] " + args[0], *args[1:], **kwargs)
+    @staticmethod
+    def side_open(args: argparse.Namespace, file, mode: str = "wt"):
+        """Open a side output file of a plugin such as a k-path file.
+
+        When the outputs go into an archive (``-o *.tar``/``*.zip``), the file becomes
+        an archive member, added when closed. A relative file name is kept as the member
+        path (e.g. 'd1/POSCAR_KP.akp' beside 'd1/POSCAR_KP.in'), and an absolute one is
+        reduced to the file name.
+
+        Args:
+            args: Processed arguments from ``parse_args``.
+            file: A side file name.
+            mode: A file mode for writing.
+
+        Returns:
+            A file object usable in a ``with`` statement.
+        """
+        sink = getattr(args, "pSink", None)
+        if sink is None:
+            return AsecIO.fopen(file, mode)
+        p = PurePosixPath(Path(file).as_posix())
+        return sink.open(p.name if p.is_absolute() else str(p))
+
+    def piprint(self, *args, level=INFO, **kwargs):
+        """Plugin print with ``clspre`` tag, skipped under ``--quiet``."""
+        text = " ".join(map(str, args))
+        logger.log(level, " - [{}] {}", self.clspre, text, **kwargs)
+
+    def piwarn(self, *args, **kwargs):
+        """Plugin warning with ``clspre`` tag."""
+        self.piprint(*args, level=WARN, **kwargs)
 
     def piexception(self, *args, **kwargs):
         """Plugin exeception with ``clspre`` tag."""
@@ -136,7 +176,8 @@ class AsecIO(_AsecBase):
             return
 
         for key, p in self._plugins.items():
-            self._instances.append(p())
+            with startup.measure("init", key):
+                self._instances.append(p())
 
         self._piinit = True
 
@@ -170,8 +211,28 @@ class AsecIO(_AsecBase):
             The opened atom image.
 
         """
+        if isinstance(file, ArchiveMember):
+            return self.read_member(file, type, **kwargs)
         return ase.io.read(file, format=type, **kwargs)
 
+    @staticmethod
+    def read_member(file: ArchiveMember, type: str = None, **kwargs):
+        """Read an archive member from its buffer with ``ase.io.read``.
+
+        Args:
+            file: An archive member.
+            type: Input file type. Guessed from the member name if None.
+            kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            The opened atom image(s).
+        """
+        if type is None:
+            type = ase.io.formats.filetype(str(split_suffix(file)[0]), read=False)
+        mode = "rb" if ase.io.formats.ioformats[type].isbinary else "rt"
+        with AsecIO.fopen(file, mode) as f:
+            return ase.io.read(f, format=type, **kwargs)
+
     def write(self, args: argparse.Namespace, atom: ase.Atoms, type: str, file: str):
         """Write function of an ``atom`` image for the plugin.
 
@@ -198,3 +259,146 @@ class AsecIO(_AsecBase):
         """
 
         return " ".join([str.format(fmt, x) for x in vec])
+
+    @staticmethod
+    def format_rows(rowfmt: str, *cols) -> str:
+        """Format rows of columns at once with a printf-style row format.
+
+        The columns are interleaved into one table, and the whole table is formatted by
+        a single ``%`` operation instead of a ``str.format`` call per value.
+
+        Args:
+            rowfmt: A format of a row such as ``"%s %20.16f %20.16f %20.16f\\n"``.
+            cols: Columns of (N,) or (N, k) arrays or lists in the order of ``rowfmt``.
+                The ``%s`` columns should be strings.
+
+        Returns:
+            The formatted rows.
+        """
+        import numpy as np
+
+        n = len(cols[0]) if cols else 0
+        if n == 0:
+            return ""
+        arrs = [np.asarray(c).reshape(n, -1) for c in cols]
+        dtype = float if all(a.dtype.kind in "biuf" for a in arrs) else object
+        rows = np.empty((n, sum(a.shape[1] for a in arrs)), dtype=dtype)
+        j = 0
+        for a in arrs:
+            rows[:, j : j + a.shape[1]] = a
+            j += a.shape[1]
+        return (rowfmt * n) % tuple(rows.ravel().tolist())
+
+    @staticmethod
+    def write_rows(f, rowfmt: str, *cols, chunk: int = 65536):
+        """Write rows of columns to a file in chunks with ``format_rows``.
+
+        Args:
+            f: A text file object.
+            rowfmt: A format of a row.
+            cols: Columns of (N,) or (N, k) arrays or lists.
+            chunk: The number of rows per chunk.
+        """
+        n = len(cols[0]) if cols else 0
+        for i in range(0, n, chunk):
+            f.write(AsecIO.format_rows(rowfmt, *[c[i : i + chunk] for c in cols]))
+
+    @staticmethod
+    def fopen(file, mode: str = "rt", level: int = None):
+        """Open a file or pass through a file-like object.
+
+        The files with a compression suffix ('.gz', '.bz2', '.xz', '.lzma')
+        are streamed through the codec. Archive members are rewound or
+        truncated according to ``mode``.
+
+        Args:
+            file: A file name or a file-like object.
+            mode: A file mode as in ``open``.
+            level: The compression level for writing. None for the codec default.
+
+        Returns:
+            A file object usable in a ``with`` statement.
+        """
+        if isinstance(file, ArchiveMember):
+            return file.reopen(mode)
+        if hasattr(file, "read") or hasattr(file, "write"):
+            return nullcontext(file)
+        return copen(file, mode, level)
+
+    @staticmethod
+    @contextmanager
+    def mapfile(file: str):
+        """Memory-map a file for reading.
+
+        Args:
+            file: A file name or an archive member.
+
+        Compressed files are decompressed into memory instead.
+
+        Yields:
+            A read-only ``mmap.mmap`` (``bytes`` for an empty or compressed file, or a member).
+        """
+        if isinstance(file, ArchiveMember):
+            yield file.getvalue()
+            return
+        if split_suffix(file)[1] != "":
+            with copen(file, "rb") as f:
+                yield f.read()
+            return
+        with open(file, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                yield b""
+                return
+            with mm:
+                yield mm
+
+    @staticmethod
+    def skip_lines(buf, pos: int, nlines: int, chunk: int = 1 << 24) -> int:
+        """Find the offset after ``nlines`` lines from ``pos`` in a buffer.
+
+        Newlines are counted in chunks with ``numpy``, so skipping a large block
+        does not loop over each line in python.
+
+        Args:
+            buf: A ``bytes`` like buffer such as ``mmap.mmap``.
+            pos: The start offset.
+            nlines: The number of lines to skip.
+            chunk: The maximum chunk size in bytes.
+
+        Returns:
+            The offset after the skipped lines. The buffer size if the lines run out.
+        """
+        import numpy as np
+
+        size = len(buf)
+        chunk = min(chunk, max(4096, nlines * 128))
+        while nlines > 0 and pos < size:
+            n = min(chunk, size - pos)
+            arr = np.frombuffer(buf, np.uint8, count=n, offset=pos)
+            inl = np.flatnonzero(arr == 10)
+            if len(inl) >= nlines:
+                return pos + int(inl[nlines - 1]) + 1
+            nlines -= len(inl)
+            pos += n
+        return size
+
+    @staticmethod
+    def select_frames(frames, index) -> list:
+        """Select frames by an ``ase.io.read`` style ``index``.
+
+        Args:
+            frames: A sequence of frames.
+            index: An index such as ':', '-1', '1:5:2', ``int`` or ``slice``.
+
+        Returns:
+            The ``list`` of the selected frames.
+        """
+        from ase.io.formats import string2index
+
+        if isinstance(index, str):
+            index = string2index(index)
+        if isinstance(index, slice):
+            return list(frames[index])
+        return [frames[index]]
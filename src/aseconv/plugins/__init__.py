@@ -9,6 +9,7 @@ from pathlib import Path
 import traceback
 from importlib import util
 import importlib
+from aseconv import startup
 
 # https://packaging.python.org/en/latest/guides/creating-and-discovering-plugins/
 
@@ -19,7 +20,8 @@ def _load_module(path, name):
     module_name = os.path.splitext(os.path.basename(path))[0]
     spec = util.spec_from_file_location(name, path)
     module = util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    with startup.measure("plugin", str(path)):
+        spec.loader.exec_module(module)
     return module
 
 
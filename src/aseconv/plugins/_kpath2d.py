@@ -6,10 +6,16 @@ https://github.com/aiidateam/aiida-core/blob/b7e37ce50ba1d6a5de62ad95357befdedda
 from __future__ import annotations
 from ase import Atoms
 from aseconv import geoutil as gu
+from aseconv.log import logger
 
 
 def kpath_2d(
-    args: argparse.Namespace, oatom: Atoms, lnums: list, ksidx: int
+    args: argparse.Namespace,
+    oatom: Atoms,
+    lnums: list,
+    ksidx: int,
+    cache=None,
+    symprec: float = 0.5,
 ) -> tuple(Atoms, dict):
     """2D Kpath generator.
 
@@ -18,6 +24,8 @@ def kpath_2d(
         oatom: Input atom image.
         lnums: List of the number of atoms per each element.
         ksidx: Slab index.
+        cache: A ``JsonCache`` of the symmetry results, or None.
+        symprec: Symmetry tolerance.
 
     Returns:
         ratoms: Rotated atom.
@@ -188,9 +196,21 @@ def kpath_2d(
     ratom = gu.align_slabaxistoz(oatom, ksidx)  # Always must be rotated for 2D path
 
     spcell = (ratom.cell, ratom.get_scaled_positions(), lnums)
-    data = spg.get_symmetry_dataset(spcell, symprec=0.5)
+    data = None
+    if cache is not None:
+        # Not reduced, since the path depends on the cell setting.
+        fp = gu.structure_fingerprint(ratom, lnums, reduce=False, extra=(symprec,))
+        ckey = cache.key("kpath-2d", fp)
+        data = cache.get_json(ckey)
+        if data is not None:
+            logger.info(" - [kpath-2d] Symmetry from the cache...")
     if data is None:
-        raise Exception(" - [kpath-2d] Could not get symmetry info..")
+        data = spg.get_symmetry_dataset(spcell, symprec=symprec)
+        if data is None:
+            raise Exception(" - [kpath-2d] Could not get symmetry info..")
+        data = {"international": data["international"], "number": int(data["number"])}
+        if cache is not None:
+            cache.put_json(ckey, data)
 
     grp = data["international"]
     grpn = data["number"]
@@ -198,7 +218,9 @@ def kpath_2d(
     bidx = brav["index"]
     angs = ratom.cell.angles()
 
-    print(" - [kpath-2d] %s(%d) (%.2f degree)" % (brav["extended_name"], bidx, angs[2]))
+    logger.info(
+        " - [kpath-2d] {}({}) ({:.2f} degree)", brav["extended_name"], bidx, angs[2]
+    )
     kp = arrs[bidx].copy()
     if bidx == 7 or bidx == -7:
         sign = np.sign(bidx)
@@ -1,7 +1,12 @@
 """kpath on Brillouinzone drawing functions"""
 
 from __future__ import annotations
+import json
 import numpy as np
+from aseconv.log import logger
+
+# Suffix of the deferred drawing data
+BZJSON = ".bzjson"
 
 
 def _bzone_3d(cell: ase.cell.Cell) -> scipy.spatial.Voronoi:
@@ -33,9 +38,64 @@ def _bzone_3d(cell: ase.cell.Cell) -> scipy.spatial.Voronoi:
     return vor.vertices[bz_vertices], bz_ridges, bz_facets
 
 
-def draw_brillouinzone(show, bzfile, atom, kp):
+def trim_image(img: np.ndarray) -> np.ndarray:
+    """Crop the transparent margins of an RGBA image as ``convert -trim`` does."""
+    opaque = img[..., 3] > 0
+    rows = np.flatnonzero(opaque.any(axis=1))
+    cols = np.flatnonzero(opaque.any(axis=0))
+    if len(rows) == 0:
+        return img
+    return img[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1]
+
+
+def write_bzjson(bzfile, atom, kp) -> str:
+    """Save the drawing data for ``render_bzjson`` instead of drawing now.
+
+    Returns:
+        The written file name.
+    """
+    keys = ["spacegroup_international", "spacegroup_number", "bravais_lattice_extended"]
+    data = {k: kp[k] for k in keys if kp.get(k) is not None}
+    data.update(
+        {
+            "cell": np.asarray(atom.cell).tolist(),
+            "path": [list(p) for p in kp["path"]],
+            "point_coords": {
+                k: np.asarray(v, dtype=float).tolist()
+                for k, v in kp["point_coords"].items()
+            },
+        }
+    )
+    if "spacegroup_number" in data:
+        data["spacegroup_number"] = int(data["spacegroup_number"])
+    ofile = str(bzfile) + BZJSON
+    with open(ofile, "wt") as f:
+        json.dump(data, f)
+    logger.info(" - Writing '{}'...", ofile)
+    return ofile
+
+
+def render_bzjson(file, fmt: str = "png") -> str:
+    """Draw a Brillouin zone saved by ``write_bzjson``.
+
+    Returns:
+        The figure file name.
+    """
+    from ase import Atoms
+
+    with open(file) as f:
+        data = json.load(f)
+    atom = Atoms(cell=data.pop("cell"), pbc=True)
+    data["path"] = [tuple(p) for p in data["path"]]
+    bzfile = str(file)
+    if bzfile.endswith(BZJSON):
+        bzfile = bzfile[: -len(BZJSON)]
+    return draw_brillouinzone(False, bzfile, atom, data, fmt)
+
+
+def draw_brillouinzone(show, bzfile, atom, kp, fmt="png"):
+    import io
     import matplotlib as mpl
-    import sys, os
 
     # if ('ss' in args.kfile):
     # 	mpl.use('Agg')
@@ -197,15 +257,19 @@ def draw_brillouinzone(show, bzfile, atom, kp):
         plt.show()
 
     ax.set_axis_off()
-    ofile = "{}_D{}_A{:.1f}_E{:.1f}.png".format(str(bzfile), zoom, ax.azim, ax.elev)
-
-    fig.savefig(ofile, dpi=300, transparent=True)  # pad_inches = 0)
-    plt.close()
-    # TODO check convert
-    try:
-        os.system("convert -trim %s %s" % (ofile, ofile))
-    except:
-        print(sys.exc_info())
-        print(" - convert trim failed, please install ImageMagick...")
-
-    print(" - Writing '{}'...".format(ofile))
+    ofile = "{}_D{}_A{:.1f}_E{:.1f}.{}".format(
+        str(bzfile), zoom, ax.azim, ax.elev, fmt
+    )
+
+    if fmt == "png":
+        # Trimmed in memory instead of ImageMagick ``convert -trim``
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=300, transparent=True)
+        buf.seek(0)
+        plt.imsave(ofile, trim_image(plt.imread(buf, format="png")), dpi=300)
+    else:
+        fig.savefig(ofile, format=fmt, transparent=True, bbox_inches="tight")
+    plt.close(fig)
+
+    logger.info(" - Writing '{}'...", ofile)
+    return ofile
@@ -1,6 +1,10 @@
 """FHI-aims IO plugin module."""
 
+import re
+import numpy as np
+import aseconv.geoutil as gu
 from aseconv.pluginbase import AsecIO
+from aseconv.log import logger
 
 
 class AimsIO(AsecIO):
@@ -16,17 +20,113 @@ class AimsIO(AsecIO):
     def infos(self):
         return {"help": "FHI-aims plugin type", "typeexts": {"aims": ".in"}}
 
-    def _const_FixScaled(self, arr, kw):
-        idx = kw["a"]
-        mask = kw["mask"]
-        arr[idx] = mask
+    _conrel = "  constrain_relaxation  "
 
-    def _const_FixAtoms(self, arr, kw):
-        ind = kw["indices"]
-        for i in ind:
-            if arr[i]:
-                print("[WARN] [{}] is fixed by other...".format(i))
-            arr[i] = [True] * 3
+    @classmethod
+    def _const_lines(cls) -> list:
+        """``constrain_relaxation`` lines for each fix mask code (x:1, y:2, z:4)."""
+        ret = []
+        for code in range(8):
+            if code == 7:
+                ret.append("\n" + cls._conrel + ".true.")
+                continue
+            ret.append(
+                "".join(
+                    "\n" + cls._conrel + chr(ord("x") + j)
+                    for j in range(3)
+                    if code & (1 << j)
+                )
+            )
+        return ret
+
+    _geore = re.compile(
+        rb"^[ \t]*(atom_frac|atom|lattice_vector|constrain_relaxation"
+        rb"|initial_moment|initial_charge|velocity)[ \t]+([^#\r\n]*)",
+        re.M,
+    )
+    _concode = {b".true.": 7, b"x": 1, b"y": 2, b"z": 4}
+
+    def read(self, file, type, **kwargs):
+        """Native reader of ``geometry.in`` files.
+
+        The keyword lines are tokenized in bulk from a memory-mapped file, and the
+        ``constrain_relaxation`` lines are collected into an N x 3 fix mask.
+        Files with ``symmetry_*`` blocks are read by ``ase.io.read``.
+        """
+        from ase import Atoms
+        from ase.data import atomic_numbers
+        from ase.units import Ang, fs
+
+        with self.mapfile(file) as buf:
+            if buf.find(b"symmetry_") >= 0:
+                kwargs.setdefault("index", ":")
+                return super().read(file, "aims", **kwargs)
+            found = self._geore.findall(buf)
+
+        kws = np.array([x[0] for x in found], dtype=object)
+        vals = np.array([x[1] for x in found], dtype=object)
+        isatom = (kws == b"atom") | (kws == b"atom_frac")
+        # Index of the last atom line for each keyword line
+        iatom = np.cumsum(isatom) - 1
+        natom = int(isatom.sum())
+        nfrac = int((kws == b"atom_frac").sum())
+        if nfrac > 0 and nfrac != natom:
+            raise Exception(
+                "Can't specify atom positions with mixture of "
+                "Cartesian and fractional coordinates"
+            )
+
+        def table(sel, ncol):
+            tok = b" ".join(vals[sel]).split()
+            return np.array(tok, dtype=np.bytes_).reshape(-1, ncol)
+
+        atoms = table(isatom, 4)
+        pos = atoms[:, :3].astype(float)
+        syms, inv = np.unique(atoms[:, 3], return_inverse=True)
+        nums = np.array([atomic_numbers[x.decode()] for x in syms], dtype=int)
+        lat = table(kws == b"lattice_vector", 3).astype(float)
+        pbc = np.arange(3) < len(lat)
+        cell = np.zeros((3, 3))
+        cell[: len(lat)] = lat
+        if nfrac > 0 and pbc.any():
+            atom = Atoms(
+                numbers=nums[inv.reshape(-1)], scaled_positions=pos, cell=cell, pbc=pbc
+            )
+        else:
+            atom = Atoms(numbers=nums[inv.reshape(-1)], positions=pos, cell=cell, pbc=pbc)
+
+        def peratom(key, ncol=1):
+            sel = (kws == key) & (iatom >= 0)
+            if not sel.any():
+                return None, None
+            return iatom[sel], table(sel, ncol).astype(float)
+
+        idx, v = peratom(b"initial_moment")
+        if idx is not None:
+            arr = np.zeros(natom)
+            arr[idx] = v[:, 0]
+            atom.set_initial_magnetic_moments(arr)
+        idx, v = peratom(b"initial_charge")
+        if idx is not None:
+            arr = np.zeros(natom)
+            arr[idx] = v[:, 0]
+            atom.set_initial_charges(arr)
+        idx, v = peratom(b"velocity", 3)
+        if idx is not None:
+            arr = np.zeros((natom, 3))
+            arr[idx] = v * (Ang / (1000.0 * fs))
+            atom.set_velocities(arr)
+
+        # constraint lines before the first atom belong to the lattice vectors
+        sel = (kws == b"constrain_relaxation") & (iatom >= 0)
+        if sel.any():
+            code = np.zeros(natom, dtype=int)
+            flags = [self._concode.get(x.strip(), 0) for x in vals[sel]]
+            np.bitwise_or.at(code, iatom[sel], flags)
+            mask = (code[:, None] & [1, 2, 4]) > 0
+            atom.set_constraint(gu.mask_constraints(mask))
+
+        return self.select_frames([atom], kwargs.get("index", ":"))
 
     def write(self, args, atom, type, ofile):
         iscart = args.C
@@ -34,7 +134,7 @@ class AimsIO(AsecIO):
         outstr = []
         sort_atom = atom[atom.numbers.argsort()]
         outstr.append("# " + str(sort_atom.symbols))
-        conrel = "  constrain_relaxation  "
+        conrel = self._conrel
         if atom.cell.volume != 0:
             # special case for the strain
             if len(atom.constraints) == atom.get_global_number_of_atoms():
@@ -57,49 +157,23 @@ class AimsIO(AsecIO):
         else:
             pos = atom.get_scaled_positions(wrap=False)
             atom_str = "atom_frac"
-        const_arr = [None] * atom.get_global_number_of_atoms()
-        err = 0
-        for i in atom.constraints:
-            d = i.todict()
-            name = d["name"]
-            func = getattr(self, "_const_" + name, None)
-            if not func:
-                print(
-                    " [ERR] Unhandled constraint exists({}), please report.".format(
-                        name
-                    )
-                )
-                err += 1
-                continue
-            func(const_arr, d["kwargs"])
-
-        if err > 0:
+        mask, unhandled = gu.constraint_mask(atom)
+        for name in unhandled:
+            logger.error(" [ERR] Unhandled constraint exists({}), please report.", name)
+        if len(unhandled) > 0:
             try:
                 ofile.unlink()
             except OSError as e:
                 pass
             return
 
-        sym = atom.get_chemical_symbols()
-
-        for i, xyz in enumerate(pos):
-            lstr = atom_str + "   " + self.vec2str(xyz) + " " + sym[i]
-            outstr.append(lstr)
-            con = const_arr[i]
-            if not con:
-                continue
-            if con[0] and con[1] and con[2]:
-                lstr = conrel + ".true."
-                outstr.append(lstr)
-                continue
-
-            for j, xx in enumerate(con):
-                if not xx:
-                    continue
-                lstr = conrel + chr(ord("x") + j)
-                outstr.append(lstr)
+        sym = np.array(atom.get_chemical_symbols(), dtype=object)
+        cons = np.array(self._const_lines(), dtype=object)[mask @ [1, 2, 4]]
+        # atom_str + "   " + vec2str(xyz) + " " + sym + constraint lines
+        rowfmt = atom_str + "   %20.16f %20.16f %20.16f %s%s\n"
 
         # print(" - Writing '{}'...{}".format(str(ofile)," "*20),end=end)
-        with open(ofile, "wt") as f:
+        with self.fopen(ofile, "wt", args.clevel) as f:
             f.write("\n".join(outstr))
             f.write("\n")
+            self.write_rows(f, rowfmt, pos, sym, cons)
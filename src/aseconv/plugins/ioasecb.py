@@ -0,0 +1,140 @@
+"""aseconv binary structure container IO plugin module."""
+
+import io
+import json
+import struct
+from pathlib import Path
+import numpy as np
+import aseconv.geoutil as gu
+from aseconv.pluginbase import AsecIO
+from aseconv.log import logger
+from aseconv.compress import split_suffix
+
+
+class BinContainerIO(AsecIO):
+    """Binary multi-frame structure container (``.asecb``).
+
+    Layout::
+
+        MAGIC | frame arrays ... | index JSON | index size (<Q) | ENDMAGIC
+
+    Every per-atom array (``numbers``, ``positions``, ``tags``, ...) is stored raw at a
+    64-byte aligned offset, and the constraints as a fix mask code (x:1, y:2, z:4).
+    The index JSON keeps the cell, pbc and the array offsets of each frame, so frames
+    are appended by rewriting only the index. Arrays are loaded as copy-on-write
+    ``np.memmap`` views without reading the data.
+
+    """
+
+    MAGIC = b"ASECB\0\1\0"
+    ENDMAGIC = b"ASECBEND"
+    ALIGN = 64
+
+    def __init__(self):
+        pass
+
+    def infos(self):
+        return {"help": "aseconv binary container", "typeexts": {"asecb": ".asecb"}}
+
+    def _index(self, f) -> tuple:
+        """Read the index of an opened file.
+
+        Returns:
+            A ``tuple`` containing
+
+             - frames (list): The frame entries.
+             - end (int): The end offset of the frame data.
+        """
+        name = getattr(f, "name", "")
+        f.seek(0, 2)
+        size = f.tell()
+        tail = struct.calcsize("<Q") + len(self.ENDMAGIC)
+        f.seek(0)
+        if f.read(len(self.MAGIC)) != self.MAGIC or size < len(self.MAGIC) + tail:
+            raise Exception(f" - [BinContainerIO] Not an asecb file '{name}'...")
+        f.seek(size - tail)
+        (nidx,) = struct.unpack("<Q", f.read(8))
+        if f.read(len(self.ENDMAGIC)) != self.ENDMAGIC:
+            raise Exception(f" - [BinContainerIO] Broken index in '{name}'...")
+        end = size - tail - nidx
+        f.seek(end)
+        return json.loads(f.read(nidx))["frames"], end
+
+    def read(self, file, type, **kwargs):
+        """Read the selected frames as ``np.memmap`` views of the file."""
+        from ase import Atoms
+
+        if hasattr(file, "getvalue") or split_suffix(file)[1] != "":
+            # Compressed containers and archive members are loaded into memory.
+            with self.fopen(file, "rb") as f:
+                mm = np.frombuffer(bytearray(f.read()), dtype=np.uint8)
+            frames, _ = self._index(io.BytesIO(mm))
+        else:
+            with open(file, "rb") as f:
+                frames, _ = self._index(f)
+            mm = np.memmap(file, dtype=np.uint8, mode="c")
+        ret = []
+        for fr in self.select_frames(frames, kwargs.get("index", ":")):
+            arrays = {}
+            for name, (off, dtype, shape) in fr["arrays"].items():
+                dt = np.dtype(dtype)
+                n = int(np.prod(shape, dtype=int)) * dt.itemsize
+                arrays[name] = np.asarray(mm[off : off + n]).view(dt).reshape(shape)
+            code = arrays.pop("fixmask", None)
+            atom = Atoms(cell=fr["cell"], pbc=fr["pbc"])
+            # Assigned directly, since Atoms() copies the given arrays.
+            atom.arrays = arrays
+            if code is not None:
+                atom.set_constraint(gu.mask_constraints((code[:, None] & [1, 2, 4]) > 0))
+            atom.info.update(fr.get("info", {}))
+            ret.append(atom)
+        return ret
+
+    def write(self, args, atom, type, ofile):
+        """Append a frame, creating the file if it does not exist."""
+        # Archive members are compressed by the sink.
+        ismember = hasattr(ofile, "write")
+        if not ismember and split_suffix(ofile)[1] != "":
+            raise Exception(" - [BinContainerIO] Compressed output is not supported...")
+        arrays = {k: v for k, v in atom.arrays.items() if v.dtype.kind in "biuf"}
+        if atom.constraints:
+            mask, unhandled = gu.constraint_mask(atom)
+            for name in unhandled:
+                logger.warn("[WARN] Unhandled constraint ({}) is ignored...", name)
+            arrays["fixmask"] = (mask @ [1, 2, 4]).astype(np.uint8)
+
+        exists = ofile.exists() if ismember else Path(ofile).exists()
+        with self.fopen(ofile, "r+b" if exists else "w+b") as f:
+            frames = []
+            if exists:
+                frames, end = self._index(f)
+                f.seek(end)
+                f.truncate()
+            else:
+                f.write(self.MAGIC)
+            entry = {}
+            for name, arr in arrays.items():
+                arr = np.ascontiguousarray(arr)
+                pad = -f.tell() % self.ALIGN
+                f.write(b"\0" * pad)
+                entry[name] = [f.tell(), arr.dtype.str, list(arr.shape)]
+                f.write(arr)
+            info = {}
+            for k, v in atom.info.items():
+                try:
+                    json.dumps(v)
+                    info[k] = v
+                except TypeError:
+                    pass
+            frames.append(
+                {
+                    "cell": atom.cell.tolist(),
+                    "pbc": atom.pbc.tolist(),
+                    "arrays": entry,
+                    "info": info,
+                }
+            )
+            idx = json.dumps({"frames": frames}).encode()
+            f.write(idx)
+            f.write(struct.pack("<Q", len(idx)))
+            f.write(self.ENDMAGIC)
@@ -1,6 +1,11 @@
 """LAMMPS IO plugin module."""
 
+import re
+import glob
+from pathlib import Path
 from aseconv.pluginbase import AsecIO
+from aseconv.log import logger
+from aseconv.compress import split_suffix
 
 
 class LammpsIO(AsecIO):
@@ -33,7 +38,7 @@ class LammpsIO(AsecIO):
                 for p in lst[0]:
                     idx = ord(p.upper()) - ord("X")
                     fix[idx] = True
-            print("  - Applying {}, fix {} ".format(i, fstr))
+            logger.info("  - Applying {}, fix {} ", i, fstr)
             with open(pf) as f:
                 lines = f.readlines()
             alst = []
@@ -50,72 +55,201 @@ class LammpsIO(AsecIO):
         # print(arrcon)
         return arrcon
 
-    def _lammps_read(args, pfile):
-        from ase.data import (
-            atomic_numbers,
-        )  # , atomic_names, atomic_masses, covalent_radii
-
-        with open(pfile) as f:
-            lines = f.readlines()
-            adict = {}
-            for il, l in enumerate(lines):
-                if "atom types" in l:
-                    ntype = int(l.split()[0])
-                    continue
-                if l.startswith("Atom Type Labels"):
-                    for i in range(il + 2, il + 2 + ntype):
-                        arr = lines[i].split()
-                        adict.update({int(arr[0]): atomic_numbers[arr[1]]})
-                    return adict
-        return None
+    # Columns of (type, charge, x) for each atom style.
+    _stylecols = {"atomic": (1, None, 2), "charge": (1, 2, 3), "full": (2, 3, 4)}
+    _extstyle = {".lmp": "atomic", ".lmpc": "charge", ".lmpf": "full"}
+
+    @staticmethod
+    def _nextline(buf, pos):
+        """Returns (stripped line without comment, raw line, next offset)."""
+        end = buf.find(b"\n", pos)
+        if end < 0:
+            end = len(buf)
+        raw = buf[pos:end].decode()
+        return raw.split("#")[0].strip(), raw, end + 1
+
+    def _read_atoms(s, buf, pos, natom, style, labels):
+        import numpy as np
+        import warnings
+
+        end = s.skip_lines(buf, pos, natom)
+        block = bytes(buf[pos:end])
+        if b"#" in block:
+            block = re.sub(rb"#[^\n]*", b"", block)
+        ncol = len(block[: block.find(b"\n")].split())
+        if ncol == 0:
+            raise Exception(f" - [LammpsIO] Invalid Atoms section at {pos}...")
+        itype = s._stylecols[style][0]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                arr = np.fromstring(block, sep=" ")
+            if arr.size != natom * ncol:
+                raise ValueError
+            arr = arr.reshape(natom, ncol)
+            types = arr[:, itype].astype(int)
+        except (ValueError, DeprecationWarning):
+            # Type labels in the Atoms section
+            sarr = np.array(block.decode().split()).reshape(natom, ncol)
+            ulabel, types = np.unique(sarr[:, itype], return_inverse=True)
+            sarr[:, itype] = "0"
+            arr = sarr.astype(float)
+            ltype = {v: k for k, v in labels.items()}
+            tmap = []
+            for x in ulabel:
+                if x not in ltype and not x.isdigit():  # No labels section
+                    ltype[x] = max(ltype.values(), default=0) + 1
+                    labels[ltype[x]] = x
+                tmap.append(ltype[x] if x in ltype else int(x))
+            types = np.array(tmap)[types.reshape(-1)]
+        return arr, types, end
 
     def read(s, file, type, **kwargs):
-        format = "lammps-data"
-        pfile = Path(file)
-        ext = pfile.suffix
-        if ext == ".lmp":
-            parm = {"style": "atomic"}
-        elif ext == ".lmpc":
-            parm = {"style": "charge"}
-        elif ext == ".lmpf":
-            parm = {"style": "full"}
-        zdict = _lammps_read(args, pfile)
-        if zdict is not None:
-            parm.update({"Z_of_type": zdict})
-        return ase.io.read(pfile, **kwargs, **parm)
+        """Single pass LAMMPS data reader of the atomic, charge, and full styles.
+
+        The ``Atoms`` section is parsed in bulk from a memory-mapped file.
+        The elements are identified by ``Atom Type Labels``, and then by ``Masses``.
+        """
+        import numpy as np
+        from ase import Atoms
+        from ase.data import atomic_numbers, atomic_masses
+
+        style = s._extstyle.get(split_suffix(file)[0].suffix, "atomic")
+        if type is not None:
+            style = s._extstyle.get("." + type, style)
+
+        hdr = {}
+        lohi = np.zeros((3, 2))
+        tilt = np.zeros(3)
+        labels = {}
+        masses = {}
+        arr = None
+        with s.mapfile(file) as buf:
+            size = len(buf)
+            _, _, pos = s._nextline(buf, 0)  # Title
+            while pos < size:
+                line, raw, pos = s._nextline(buf, pos)
+                if line == "":
+                    continue
+                tok = line.split()
+                if line[0] in "0123456789+-.":  # header
+                    key = " ".join(x for x in tok if x[0].isalpha())
+                    if key in ("xlo xhi", "ylo yhi", "zlo zhi"):
+                        lohi[ord(key[0]) - ord("x")] = tok[:2]
+                    elif key == "xy xz yz":
+                        tilt[:] = tok[:3]
+                    else:
+                        hdr[key] = int(tok[0])
+                    continue
+
+                # section
+                if line == "Atoms":
+                    sm = re.search(r"#\s*(\w+)", raw)
+                    if sm and sm.group(1) in s._stylecols:
+                        style = sm.group(1)
+                natom = hdr.get("atoms", 0)
+                nsec = {
+                    "Atoms": natom,
+                    "Velocities": natom,
+                    "Masses": hdr.get("atom types", 0),
+                    "Atom Type Labels": hdr.get("atom types", 0),
+                }.get(line, -1)
+                # skip blank lines
+                while pos < size:
+                    l, _, npos = s._nextline(buf, pos)
+                    if l != "":
+                        break
+                    pos = npos
+                if line == "Atoms":
+                    arr, types, pos = s._read_atoms(buf, pos, natom, style, labels)
+                    if labels or masses:
+                        break
+                elif line in ("Masses", "Atom Type Labels"):
+                    for i in range(nsec):
+                        l, _, pos = s._nextline(buf, pos)
+                        t = l.split()
+                        if line == "Masses":
+                            masses[int(t[0])] = float(t[1])
+                        else:
+                            labels[int(t[0])] = t[1]
+                elif nsec >= 0:
+                    pos = s.skip_lines(buf, pos, nsec)
+                else:  # unknown size, until a blank line
+                    while pos < size:
+                        l, _, pos = s._nextline(buf, pos)
+                        if l == "":
+                            break
+
+        if arr is None:
+            raise Exception(f" - [LammpsIO] No Atoms section in '{file}'...")
+
+        ztype = {}
+        amass = np.array(atomic_masses)
+        for t in set(masses) | set(labels):
+            if t in labels and labels[t] in atomic_numbers:
+                ztype[t] = atomic_numbers[labels[t]]
+            elif t in masses:
+                ztype[t] = int(np.abs(amass[1:] - masses[t]).argmin()) + 1
+        tmax = max(types.max(initial=0), max(ztype, default=0))
+        zmap = np.arange(tmax + 1)
+        for t, z in ztype.items():
+            zmap[t] = z
+
+        order = np.argsort(arr[:, 0], kind="stable")
+        if (order != np.arange(len(order))).any():
+            arr = arr[order]
+            types = types[order]
+        itype, iq, ix = s._stylecols[style]
+        lo = lohi[:, 0]
+        hi = lohi[:, 1]
+        cell = np.diag(hi - lo)
+        cell[1, 0], cell[2, 0], cell[2, 1] = tilt
+        atom = Atoms(
+            numbers=zmap[types],
+            positions=arr[:, ix : ix + 3],
+            cell=cell,
+            pbc=True,
+        )
+        if iq is not None:
+            atom.set_initial_charges(arr[:, iq])
+        if style == "full":
+            atom.new_array("mol-id", arr[:, 1].astype(int))
+        if masses:
+            mt = np.array([masses.get(t, 0) for t in range(tmax + 1)])
+            atom.set_masses(np.where(mt[types] > 0, mt[types], atom.get_masses()))
+
+        return s.select_frames([atom], kwargs.get("index", ":"))
 
     def write(self, args, atom, type, ofile):
         # global args.Gslabidx
         import numpy as np
         import math
+        from ase.data import chemical_symbols
 
-        syms = atom.get_chemical_symbols()
+        nums = atom.get_atomic_numbers()
         amass = atom.get_masses()
         pos = atom.get_positions()
-        types = []
-        masses = []
-        lmp_atoms = []
+        natom = len(nums)
+        # Type IDs in the order of the first appearance
+        unums, ifirst, inv = np.unique(nums, return_index=True, return_inverse=True)
+        order = np.argsort(ifirst)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        types = [chemical_symbols[x] for x in unums[order]]
+        masses = amass[ifirst[order]]
+        typeids = rank[inv.reshape(-1)] + 1
         cstr = ""
         if type == "lmpc":
             cstr = " 0.000"
-        for i, s in enumerate(syms):
-            if not s in types:
-                types.append(s)
-                masses.append(amass[i])
-            r = pos[i]
-            mid = ""  # mid=1
-            idx = types.index(s) + 1
-            rz = r[2]
-            # if (args.Gslabidx > 0): rz=0 # why?
-            lmp_atoms.append(
-                "{:5} {} {:2}{} {}".format(i + 1, mid, idx, cstr, self.vec2str(r))
-            )  # r[0],r[1],rz))
+        mid = ""  # mid=1
+        # "{:5} {} {:2}{} {}" of (id, mid, type, cstr, vec2str(r))
+        rowfmt = "%5d {} %2d{} %20.16f %20.16f %20.16f\n".format(mid, cstr)
 
         lstr = []
         hi = atom.cell.lengths()
 
         lstr.append("#TYPEMAP:%s" % " ".join(types))
-        lstr.append("\n{:6} atoms\n{:6} atom types".format(len(syms), len(types)))
+        lstr.append("\n{:6} atoms\n{:6} atom types".format(natom, len(types)))
 
         cell = atom.get_cell()
         # vacuum=args.v
@@ -168,8 +302,191 @@ class LammpsIO(AsecIO):
             lstr.append(" {:2} {:8.3f}  # {}".format(i, at, types[i - 1]))
 
         lstr.append("\nAtoms\n")  ## Blank lines are critical
-        lstr.extend(lmp_atoms)
 
-        with open(ofile, "wt") as f:
+        with self.fopen(ofile, "wt", args.clevel) as f:
+            f.write("\n".join(lstr))
+            f.write("\n")
+            self.write_rows(f, rowfmt, np.arange(1, natom + 1), typeids, pos)
+
+
+class LammpsDumpIO(AsecIO):
+    """LAMMPS text dump trajectory IO plugin.
+
+    A frame byte-offset index is built on the first read and kept as a sidecar file
+    (see ``aseconv.frameindex``), so ``--frame`` slices read only the selected frames. Frames are appended one by one when writing.
+
+    """
+
+    _poscols = (("x", "y", "z"), ("xu", "yu", "zu"), ("xs", "ys", "zs"))
+
+    def __init__(self):
+        pass
+
+    def infos(self):
+        return {"help": "LAMMPS dump text", "typeexts": {"lammps-dump": ".lammpstrj"}}
+
+    def _read_frame(self, buf, start, end):
+        import numpy as np
+        import warnings
+        from ase import Atoms
+
+        nextline = LammpsIO._nextline
+        info = {}
+        bounds = []
+        pbc = [True] * 3
+        cols = []
+        pos = start
+        while pos < end:
+            line, _, pos = nextline(buf, pos)
+            if line.startswith("ITEM: TIMESTEP"):
+                line, _, pos = nextline(buf, pos)
+                info["timestep"] = int(line)
+            elif line.startswith("ITEM: NUMBER OF ATOMS"):
+                line, _, pos = nextline(buf, pos)
+                natom = int(line)
+            elif line.startswith("ITEM: BOX BOUNDS"):
+                flags = line.split()[3:]
+                pbc = [x == "pp" for x in flags[-3:]]
+                for i in range(3):
+                    line, _, pos = nextline(buf, pos)
+                    bounds.append(list(map(float, line.split())))
+            elif line.startswith("ITEM: ATOMS"):
+                cols = line.split()[2:]
+                break
+
+        block = bytes(buf[pos:end])
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                arr = np.fromstring(block, sep=" ")
+            if arr.size != natom * len(cols):
+                raise ValueError
+            arr = arr.reshape(natom, len(cols))
+            syms = None
+        except (ValueError, DeprecationWarning):
+            sarr = np.array(block.decode().split()).reshape(natom, len(cols))
+            iel = cols.index("element")
+            syms = sarr[:, iel].copy()
+            sarr[:, iel] = "0"
+            arr = sarr.astype(float)
+
+        if "id" in cols:
+            order = np.argsort(arr[:, cols.index("id")], kind="stable")
+            arr = arr[order]
+            if syms is not None:
+                syms = syms[order]
+
+        # Box: xlo_bound xhi_bound [xy] ...
+        bounds = np.array(bounds)
+        tilt = np.zeros(3)
+        if bounds.shape[1] > 2:
+            tilt = bounds[:, 2]
+        xy, xz, yz = tilt
+        lo = bounds[:, 0] - [min(0, xy, xz, xy + xz), min(0, yz), 0]
+        hi = bounds[:, 1] - [max(0, xy, xz, xy + xz), max(0, yz), 0]
+        cell = np.diag(hi - lo)
+        cell[1, 0], cell[2, 0], cell[2, 1] = tilt
+
+        kw = {}
+        for i, pc in enumerate(self._poscols):
+            if pc[0] in cols:
+                ix = [cols.index(x) for x in pc]
+                if i == 2:
+                    kw["scaled_positions"] = arr[:, ix]
+                else:
+                    kw["positions"] = arr[:, ix] - lo
+                break
+        if syms is not None:
+            kw["symbols"] = list(syms)
+        else:
+            kw["numbers"] = arr[:, cols.index("type")].astype(int)
+        atom = Atoms(cell=cell, pbc=pbc, info=info, **kw)
+        if "q" in cols:
+            atom.set_initial_charges(arr[:, cols.index("q")])
+        return atom
+
+    def read(self, file, type, **kwargs):
+        """Read frames of a LAMMPS text dump using the frame offset index."""
+        from aseconv.frameindex import FrameIndex
+
+        with self.mapfile(file) as buf:
+            if hasattr(file, "getvalue"):  # in-memory archive members
+                offs = FrameIndex.scan("lammps-dump", buf)
+            else:
+                offs = FrameIndex(file).offsets("lammps-dump", buf)
+            iframes = self.select_frames(range(len(offs) - 1), kwargs.get("index", ":"))
+            return [self._read_frame(buf, offs[i], offs[i + 1]) for i in iframes]
+
+    def write(self, args, atom, type, ofile):
+        """Append a frame to a LAMMPS text dump.
+
+        Positions are rotated into the LAMMPS box frame, and written in Cartesian
+        (``-C``) or scaled coordinates.
+        """
+        import numpy as np
+
+        cell = atom.cell
+        natom = len(atom)
+        nums = atom.get_atomic_numbers()
+        unums, ifirst, inv = np.unique(nums, return_index=True, return_inverse=True)
+        order = np.argsort(ifirst)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        typeids = rank[inv.reshape(-1)] + 1
+        syms = np.array(atom.get_chemical_symbols(), dtype=object)
+
+        if cell.volume != 0:
+            lx, ly, lz, xy, xz, yz = self._prism(cell)
+            lcell = np.array([[lx, 0, 0], [xy, ly, 0], [xz, yz, lz]])
+            spos = atom.get_scaled_positions(wrap=False)
+            lo = np.zeros(3)
+        else:
+            pos = atom.get_positions()
+            lo = pos.min(axis=0)
+            lcell = np.diag(pos.max(axis=0) - lo)
+            xy = xz = yz = 0
+            spos = np.divide(
+                pos - lo, lcell.diagonal(), out=np.zeros_like(pos), where=lcell.diagonal() > 0
+            )
+        hi = lo + lcell.diagonal()
+
+        lstr = ["ITEM: TIMESTEP", str(atom.info.get("timestep", 0))]
+        lstr.append("ITEM: NUMBER OF ATOMS")
+        lstr.append(str(natom))
+        bflag = " ".join("pp" if x else "ff" for x in atom.pbc)
+        if xy == 0 and xz == 0 and yz == 0:
+            lstr.append("ITEM: BOX BOUNDS " + bflag)
+            for i in range(3):
+                lstr.append(self.vec2str([lo[i], hi[i]]))
+        else:
+            lstr.append("ITEM: BOX BOUNDS xy xz yz " + bflag)
+            blo = lo + [min(0, xy, xz, xy + xz), min(0, yz), 0]
+            bhi = hi + [max(0, xy, xz, xy + xz), max(0, yz), 0]
+            for i, t in enumerate([xy, xz, yz]):
+                lstr.append(self.vec2str([blo[i], bhi[i], t]))
+        if args.C:
+            lstr.append("ITEM: ATOMS id type element x y z")
+            rpos = spos @ lcell + lo
+        else:
+            lstr.append("ITEM: ATOMS id type element xs ys zs")
+            rpos = spos
+
+        rowfmt = "%d %d %s %.16f %.16f %.16f\n"
+        with self.fopen(ofile, "at", args.clevel) as f:
             f.write("\n".join(lstr))
             f.write("\n")
+            self.write_rows(f, rowfmt, np.arange(1, natom + 1), typeids, syms, rpos)
+
+    @staticmethod
+    def _prism(cell):
+        """LAMMPS box parameters (lx, ly, lz, xy, xz, yz) of a cell."""
+        import math
+
+        a, b, c, A, B, C = cell.cellpar(radians=True)
+        lx = a
+        xy = b * math.cos(C)
+        xz = c * math.cos(B)
+        ly = (b**2 - xy**2) ** 0.5
+        yz = (b * c * math.cos(A) - xy * xz) / ly
+        lz = (c**2 - xz**2 - yz**2) ** 0.5
+        return lx, ly, lz, xy, xz, yz
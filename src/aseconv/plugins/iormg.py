@@ -1,10 +1,18 @@
 """RMG IO plugin module."""
 
+import re
+import numpy as np
+import aseconv.geoutil as gu
 from aseconv.pluginbase import AsecIO
+from aseconv.log import logger
 
 
 class RMGIO(AsecIO):
-    """RMG IO Plugin. Currently supports ``write`` only."""
+    """RMG IO Plugin.
+
+    The ``atoms`` lines have the species, the coordinates, and optionally
+    the movable flags of x, y, and z (1 for movable, 0 for fixed).
+    """
 
     def __init__(self):
         pass
@@ -12,8 +20,90 @@ class RMGIO(AsecIO):
     def infos(s):
         return {"help": "RMG file", "typeexts": {"rmg": ".rmg"}}
 
+    _keyre = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+
+    # Bravais lattices built from ``a_length``, ``b_length`` and ``c_length``
+    _orthogonal = ("Cubic Primitive", "Tetragonal Primitive", "Orthorhombic Primitive")
+
+    @classmethod
+    def _bravais_cell(cls, keys, file):
+        """Cell of the ``bravais_lattice_type`` and the lattice lengths."""
+        a, b, c = [float(keys[x + "_length"]) for x in "abc"]
+        btype = " ".join(keys.get("bravais_lattice_type", "").split())
+        if btype in cls._orthogonal:
+            return np.diag([a, b, c])
+        if btype == "Hexagonal Primitive":
+            return np.array([[a, 0, 0], [-a / 2, a * np.sqrt(3) / 2, 0], [0, 0, c]])
+        raise Exception(
+            f" - [RMGIO] Unsupported bravais_lattice_type '{btype}' without"
+            f" lattice_vector in '{file}'..."
+        )
+
     def read(s, file, type, **kwargs):
-        raise Exception("RMG reading is not supported yet")
+        """Read the lattice and the atoms of an RMG input file.
+
+        The ``atoms`` block is parsed in bulk into a table of the species,
+        the coordinates, and the movable flags.
+        """
+        from ase import Atoms
+        from ase.data import atomic_numbers
+        from ase.units import Bohr
+
+        with s.fopen(file, "rt") as f:
+            text = re.sub(r"#[^\n]*", "", f.read())
+        keys = dict(s._keyre.findall(text))
+        if "atoms" not in keys:
+            raise Exception(f" - [RMGIO] No atoms in '{file}'...")
+        units = {"angstrom": 1.0, "bohr": Bohr}
+
+        lunit = units.get(keys.get("lattice_units", "Bohr").strip().lower())
+        if lunit is None:
+            raise Exception(
+                " - [RMGIO] Unsupported lattice_units '{}'...".format(
+                    keys["lattice_units"]
+                )
+            )
+        if "lattice_vector" in keys:
+            cell = np.array(keys["lattice_vector"].split(), dtype=float).reshape(3, 3)
+        elif all(x + "_length" in keys for x in "abc"):
+            cell = s._bravais_cell(keys, file)
+        else:
+            raise Exception(f" - [RMGIO] No lattice in '{file}'...")
+        cell *= lunit
+
+        block = keys["atoms"].strip()
+        nline = len([x for x in block.splitlines() if x.strip()])
+        tok = np.array(block.split(), dtype=object)
+        if nline == 0 or len(tok) % nline != 0:
+            raise Exception(f" - [RMGIO] Irregular atoms lines in '{file}'...")
+        tab = tok.reshape(nline, -1)
+        syms, inv = np.unique(tab[:, 0], return_inverse=True)
+        nums = np.array([atomic_numbers[x] for x in syms], dtype=int)
+        pos = tab[:, 1:4].astype(float)
+
+        kw = {"numbers": nums[inv.reshape(-1)], "cell": cell, "pbc": True}
+        ctype = keys.get("atomic_coordinate_type", "Absolute").strip()
+        if ctype == "Cell Relative":
+            kw["scaled_positions"] = pos
+        else:
+            cunit = units.get(keys.get("crds_units", "Bohr").strip().lower())
+            if cunit is None:
+                raise Exception(
+                    " - [RMGIO] Unsupported crds_units '{}'...".format(
+                        keys["crds_units"]
+                    )
+                )
+            kw["positions"] = pos * cunit
+        atom = Atoms(**kw)
+
+        if tab.shape[1] >= 5:
+            flags = tab[:, 4:7].astype(int) == 0
+            if flags.shape[1] == 1:
+                flags = np.repeat(flags, 3, axis=1)
+            if flags.any():
+                atom.set_constraint(gu.mask_constraints(flags))
+
+        return s.select_frames([atom], kwargs.get("index", ":"))
 
     def write(self, args, atom, type, ofile):
         # lstr=['#******** REAL SPACE GRID ********' ]
@@ -43,10 +133,17 @@ class RMGIO(AsecIO):
             lstr.append(self.vec2str(i))
 
         lstr.append('"\natoms = "')  # space must exist before '='
-        sym = atom.get_chemical_symbols()
-        for i, xyz in enumerate(pos):
-            lstr.append(sym[i] + "   " + self.vec2str(xyz))
-        lstr.extend('"\n')
-        with open(ofile, "wt") as f:
+        sym = np.array(atom.get_chemical_symbols(), dtype=object)
+        rowfmt = "%s   %20.16f %20.16f %20.16f\n"
+        cols = [sym, pos]
+        if atom.constraints:
+            mask, unhandled = gu.constraint_mask(atom)
+            for name in unhandled:
+                logger.warn("[WARN] Unhandled constraint ({}) is ignored...", name)
+            rowfmt = "%s   %20.16f %20.16f %20.16f   %d %d %d\n"
+            cols.append(~mask)
+        with self.fopen(ofile, "wt", args.clevel) as f:
             f.write("\n".join(lstr))
             f.write("\n")
+            self.write_rows(f, rowfmt, *cols)
+            f.write('"\n\n\n')
@@ -71,7 +71,7 @@ class APlugConst(AsecPlug):
                 fixinds = set(lst.get_indices())  # FixAtoms
         satom, sidx = _select_by_xyz(atom, val)
         if satom.get_global_number_of_atoms() == 0:
-            self.piprint(f"[warn] No atoms was selected by '{val}'...")
+            self.piwarn(f"[warn] No atoms was selected by '{val}'...")
 
         curfix = [[[True] * 3, sidx]]
         for i in curfix:
@@ -152,7 +152,7 @@ class APlugStrain(AsecPlug):
             if cmd is not None and "F" in cmd:  # Fix volume
                 nr = sum(straxis)
                 if nr == 3:
-                    self.piprint(f"Cannot fix volume due to '{mstr}'...")
+                    self.piwarn(f"Cannot fix volume due to '{mstr}'...")
                 elif nr == 1 or nr == 2:
                     for im, mm in enumerate(straxis):
                         if not mm:
@@ -380,7 +380,7 @@ class APlugRepeat(AsecPlug):
                 )  # to
                 nnatom = tatom.get_global_number_of_atoms()
                 if natom != nnatom:
-                    self.piprint("tot atom(%d) != expected(%d)'" % (nnatom, natom))
+                    self.piwarn("tot atom(%d) != expected(%d)'" % (nnatom, natom))
                     if tol != 0:
                         self.piprint(" Trying 0 tolereance...")
                 else:
@@ -490,7 +490,7 @@ class APlugSelect(AsecPlug):
     def process(self, args, atom, val):
         satom, __ = _select_by_xyz(atom, val)
         if satom.get_global_number_of_atoms() == 0:
-            self.piprint(f"[Warn] No atoms wa selected by '{val}'...")
+            self.piwarn(f"[Warn] No atoms wa selected by '{val}'...")
         return satom
 
 
@@ -687,7 +687,7 @@ class APlugRmLayer(AsecPlug):
     def process(self, args, atom, val):
         sidx = args.SlabIdx
         if sidx <= 0:
-            self.piprint(f"Slab index is not posive({sidx}), please use --sidx")
+            self.piwarn(f"Slab index is not posive({sidx}), please use --sidx")
             return atom
         irm = {}
         mingap = 1.9
@@ -702,7 +702,7 @@ class APlugRmLayer(AsecPlug):
         nlayers = len(ilayers)
         for i in irm.keys():
             if i >= nlayers:
-                self.piprint(f"'{i}' layer doesn't exist... (l<{nlayers})")
+                self.piwarn(f"'{i}' layer doesn't exist... (l<{nlayers})")
                 continue
             irmatom.extend(ilayers[i])
         if len(irmatom) > 0:
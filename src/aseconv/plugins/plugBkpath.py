@@ -1,8 +1,32 @@
-"""K-path generator plugin modules."""
+"""K-path and k-mesh generator plugin modules."""
 
 from __future__ import annotations
+import os
 import sys
+from pathlib import Path
+from aseconv import geoutil as gu
 from aseconv.pluginbase import AsecPlug, AsecIO
+from aseconv.log import logger
+
+
+def _side_files(args, ext: str) -> list:
+    """Side file names of the output targets, suffixed by the type for multiple types.
+
+    The files are beside the outputs, so they keep the mirrored member directories of
+    an archive input (relative member paths for an archive output).
+
+    Returns:
+        The list of (type, file name).
+    """
+    ret = []
+    targs = args.pOutTargets
+    for targ in targs:
+        ofile = targ.pOutFile
+        stem = ofile.stem
+        if len(targs) > 1:
+            stem += "_" + targ.t
+        ret.append((targ.t, ofile.parent.joinpath(stem + ext)))
+    return ret
 
 
 class APlugKpath(AsecPlug):
@@ -12,10 +36,19 @@ class APlugKpath(AsecPlug):
 
     Required: spg, ase, seekpath, numpy, scipy
 
+    With ``--cache``, the symmetry search results are kept under ``<cache>/kpath`` by
+    the structure fingerprints, so repeated setups skip the search. The 3D results hold
+    the primitive cell written as the output, so they are keyed by the exact structure.
+
     Attributes:
+        symprec: Symmetry tolerance of the path search.
 
     """
 
+    symprec = 0.5
+
+    cacheable = False
+
     def __init__(self, asec):
         # parser=asec.add_subparsers('kpath', help='Kpath generator', description="KPath Generatore")
         super().__init__()
@@ -41,6 +74,43 @@ class APlugKpath(AsecPlug):
             default=-1,
             help="Kpath 2D slab index. -1(auto)|0(bulk)|{1-3}(a-c)",
         )
+        asec.add_argument(
+            self,
+            "--bz",
+            parser=parser,
+            process=False,
+            metavar="Fmt",
+            type=str,
+            choices=["none", "png", "svg", "defer"],
+            default="none",
+            help="Brillouin zone figure of kpath. none|png|svg|defer(.bzjson for `bz` command)",
+        )
+        bparser = asec.add_command(
+            "bz",
+            self._bz_main,
+            help="Brillouin zone figures",
+            description="Draw Brillouin zone figures deferred by `geo --kp ... --bz defer`.",
+        )
+        bparser.add_argument("ins", metavar="File", nargs="+", help="*.bzjson files.")
+        bparser.add_argument(
+            "--fmt",
+            type=str,
+            choices=["png", "svg"],
+            default="png",
+            help="Figure format.",
+        )
+
+    def _bz_main(self, sargs, args):
+        import glob
+        import aseconv.plugins._kpathBZ as bz
+
+        files = [f for i in args.ins for f in glob.glob(i)]
+        if len(files) < 1:
+            logger.error(" - No .bzjson file...")
+            return 1
+        for f in files:
+            bz.render_bzjson(f, args.fmt)
+        return 0
 
     def output_postfix(self, args, opt):
         return f"_KP{self.safe_name(opt)}"
@@ -48,16 +118,25 @@ class APlugKpath(AsecPlug):
     def process(self, args, atom, val):
         ofile = args.pOutFile
         pfile = args.pInFile
-        dp = args.pParent
-        kfile = dp.joinpath(ofile.stem + ".akp")
-        bzfile = dp.joinpath(
+        kfiles = _side_files(args, ".akp")
+        bzfile = ofile.parent.joinpath(
             "bz_"
             + ofile.stem
             + "_%s_%s" % (pfile.parent.name, pfile.stem.replace("geometry_", "g"))
         )
-        sratom = self._kp_main(args, atom, val, bzfile, kfile)
+        sratom = self._kp_main(args, atom, val, bzfile, kfiles)
         return sratom
 
+    @staticmethod
+    def _kp_cache(args):
+        """The symmetry cache, or None without ``--cache``."""
+        if getattr(args, "cache", None) is None:
+            return None
+        from aseconv.cache import JsonCache
+
+        maxbytes = int(args.cachesize * 2**20)
+        return JsonCache(Path(args.cache).joinpath("kpath"), maxbytes)
+
     def _kp_3d(self, args, atom, nums, syms):
         import seekpath
         from ase import Atoms
@@ -71,10 +150,26 @@ class APlugKpath(AsecPlug):
     ##############################"""
         )
 
-        cell = (atom.cell, atom.get_scaled_positions(), nums)
-        kp = seekpath.get_path(
-            cell, symprec=0.5, threshold=0.5
-        )  # ,with_time_reversal=False)
+        cache = self._kp_cache(args)
+        kp = None
+        if cache is not None:
+            # The primitive cell of the output comes from the cached path, so only
+            # the same structure (not a mirror or a perturbed one) hits the cache.
+            fp = gu.structure_fingerprint(
+                atom, nums, extra=(syms, self.symprec), exact=True
+            )
+            ckey = cache.key("kpath-3d", fp)
+            kp = cache.get_json(ckey)
+        if kp is None:
+            cell = (atom.cell, atom.get_scaled_positions(), nums)
+            kp = seekpath.get_path(
+                cell, symprec=self.symprec, threshold=self.symprec
+            )  # ,with_time_reversal=False)
+            if cache is not None:
+                cache.put_json(ckey, kp)
+        else:
+            kp["path"] = [tuple(x) for x in kp["path"]]
+            self.piprint("Symmetry from the cache...")
 
         pre = "primitive_"
         sr_syms = []
@@ -106,7 +201,7 @@ class APlugKpath(AsecPlug):
         for l in lines:
             ar = l.split()
             if len(ar) != 8:
-                print("[WARN] '{}' is ignored".format(l))
+                logger.warn("[WARN] '{}' is ignored", l)
                 continue
             ii = 0
             points.update({ar[ii]: list(map(float, ar[ii + 1 : ii + 4]))})
@@ -132,7 +227,9 @@ class APlugKpath(AsecPlug):
         if ksidx > 0:
             import aseconv.plugins._kpath2d as kp2
 
-            sr_atom, kp = kp2.kpath_2d(args, atom, nums, ksidx)
+            sr_atom, kp = kp2.kpath_2d(
+                args, atom, nums, ksidx, self._kp_cache(args), self.symprec
+            )
             # Update slab index
             ksidx = 3
             args.SlabIdx = ksidx
@@ -176,7 +273,7 @@ class APlugKpath(AsecPlug):
 
         inst.endpath(args, ksidx, tickstr)
 
-    def _kp_main(self, args, atom, kopt, bzfile, kfile):
+    def _kp_main(self, args, atom, kopt, bzfile, kfiles):
         import aseconv.plugins._kpathBZ as bz
 
         sr_atom = None
@@ -194,23 +291,45 @@ class APlugKpath(AsecPlug):
             sr_atom = atom
 
         dkp = kp["path"]
-        if args.t == "vasp":
-            inst = KPOvasp(dkp)
-        elif args.t == "aims":
-            inst = KPOaims(dkp)
-        elif args.t == "rmg":
-            inst = KPOrmg(dkp)
-        else:
-            self.piexception(f"Unsupported type '{args.t}' for kpath...")
-
-        self._kp_output(args, kp, inst, kslabidx)
-        inst.writepath(kfile)
-
+        for type, kfile in kfiles:
+            if type == "vasp":
+                inst = KPOvasp(dkp)
+            elif type == "aims":
+                inst = KPOaims(dkp)
+            elif type == "rmg":
+                inst = KPOrmg(dkp)
+            elif len(kfiles) > 1:
+                self.piwarn(f"[WARN] Unsupported type '{type}' for kpath, skipped...")
+                continue
+            else:
+                self.piexception(f"Unsupported type '{type}' for kpath...")
+
+            self._kp_output(args, kp, inst, kslabidx)
+            with self.side_open(args, kfile) as f:
+                inst.writepath(f)
+
+        # Drawing is the slowest part, so only on request.
+        bzfmt = args.bz
+        if kopt == "ss" and bzfmt == "none":
+            bzfmt = "png"
+        if bzfmt == "none":
+            return sr_atom
+        bzdraw = bzfile
+        if args.pSink is not None:
+            # Drawn beside the archive, and added beside the output member.
+            bzdraw = args.pParent.joinpath(bzfile.name)
         try:
-            bz.draw_brillouinzone(kopt == "ss", bzfile, sr_atom, kp)
+            if bzfmt == "defer":
+                bzout = bz.write_bzjson(bzdraw, sr_atom, kp)
+            else:
+                bzout = bz.draw_brillouinzone(kopt == "ss", bzdraw, sr_atom, kp, bzfmt)
+            if args.pSink is not None:
+                name = bzfile.parent.joinpath(Path(bzout).name).as_posix()
+                args.pSink.add_file(bzout, name)
+                os.unlink(bzout)
         except:
             # print("X11 server error, please launch X11:", sys.exc_info())
-            print(sys.exc_info())
+            logger.error("{}", sys.exc_info())
             self.piexception("Draw_brillouinzone error")
 
         return sr_atom
@@ -251,14 +370,14 @@ class KPathOut:
         """
         pass
 
-    def writepath(self, kfile: str):
+    def writepath(self, kfile):
         """Write kpath to ``kfile``.
 
         Args:
-                kfile: Output file name.
+                kfile: Output file name or file object.
         """
-        print(" - Writing '{}'...".format(str(kfile)))
-        with open(kfile, "wt") as f:
+        logger.info(" - Writing '{}'...", getattr(kfile, "name", kfile))
+        with AsecIO.fopen(kfile, "wt") as f:
             f.write("\n".join(self.lpathstr))
             f.write("\n")
 
@@ -392,6 +511,163 @@ class KPOrmg(KPathOut):
         self.lpathstr.append(' "')
 
 
+def irreducible_kmesh(
+    atom, density: float, slabidx: int = 0, shift: int = 0, symprec: float = 1e-3
+) -> tuple:
+    """Symmetry-reduced Monkhorst-Pack k-mesh.
+
+    The mesh sizes are ``ceil(2 pi |b_i| density)`` as ASE ``kptdensity``, and 1 along
+    the slab axis and non-periodic axes.
+
+    Args:
+        atom: An atom image.
+        density: K-point density per 1/Angstrom.
+        slabidx: A slab axis index. 0 for bulk, 1-3(a-c).
+        shift: 0 for Gamma-centered, 1 for the half grid shifted mesh.
+        symprec: Symmetry tolerance.
+
+    Returns:
+        A ``tuple`` containing
+
+         - mesh (numpy.ndarray): The mesh sizes.
+         - kpts (numpy.ndarray): The (N, 3) irreducible k-points in fractional coordinates.
+         - weights (numpy.ndarray): The number of the mesh points mapped to each k-point.
+         - shifts (numpy.ndarray): The mesh shifts.
+    """
+    import numpy as np
+    import spglib as spg
+
+    blen = np.linalg.norm(atom.cell.reciprocal(), axis=1)
+    mesh = np.maximum(1, np.ceil(2 * np.pi * blen * density)).astype(int)
+    shifts = np.full(3, shift, dtype=int)
+    fixed = ~np.asarray(atom.pbc)
+    if slabidx > 0:
+        fixed[slabidx - 1] = True
+    mesh[fixed] = 1
+    shifts[fixed] = 0
+
+    cell = (atom.cell[:], atom.get_scaled_positions(), atom.numbers)
+    ret = spg.get_ir_reciprocal_mesh(mesh, cell, is_shift=shifts, symprec=symprec)
+    if ret is None:
+        raise Exception(" - [kmesh] Could not get symmetry info..")
+    mapping, grid = ret
+    # Irreducible points are the mapping targets, weighted by their counts.
+    ir, weights = np.unique(mapping, return_counts=True)
+    kpts = (grid[ir] + shifts / 2.0) / mesh
+    return mesh, kpts, weights, shifts
+
+
+class APlugKmesh(AsecPlug):
+    """Symmetry-reduced k-mesh generator plugin class.
+
+    Supported formats: vasp, aims, rmg only.
+
+    Required: spg, numpy
+
+    Attributes:
+        symprec: Symmetry tolerance of the mesh reduction.
+
+    """
+
+    cacheable = False
+    symprec = 1e-3
+
+    def __init__(self, asec):
+        super().__init__()
+        asec.add_argument(
+            self,
+            "--kmesh",
+            metavar="Density",
+            type=float,
+            default=None,
+            help="Generate an irreducible k-mesh of the k-point density per 1/Angstrom.",
+        )
+        asec.add_argument(
+            self,
+            "--kmshift",
+            process=False,
+            metavar="Shift",
+            type=int,
+            choices=[0, 1],
+            default=0,
+            help="K-mesh shift. 0(Gamma-centered)|1(half grid shifted)",
+        )
+
+    def output_postfix(self, args, opt):
+        return f"_KM{self.safe_name(opt)}"
+
+    def process(self, args, atom, val):
+        mesh, kpts, weights, shifts = irreducible_kmesh(
+            atom, float(val), args.SlabIdx, args.kmshift, self.symprec
+        )
+        self.piprint(
+            "{} mesh, {} irreducible k-points".format(
+                "x".join(str(x) for x in mesh), len(weights)
+            )
+        )
+        kmos = {"vasp": KMOvasp, "aims": KMOaims, "rmg": KMOrmg}
+        kfiles = _side_files(args, ".akm")
+        for type, kfile in kfiles:
+            if type not in kmos:
+                if len(kfiles) > 1:
+                    self.piwarn(f"[WARN] Unsupported type '{type}' for kmesh...")
+                    continue
+                self.piexception(f"Unsupported type '{type}' for kmesh...")
+            inst = kmos[type](mesh, kpts, weights, shifts)
+            with self.side_open(args, kfile) as f:
+                inst.writepath(f)
+        return atom
+
+
+class KMeshOut(KPathOut):
+    """K-mesh output base class.
+
+    Attributes:
+        lpathstr: List of the output strings.
+
+    """
+
+    def __init__(self, mesh, kpts, weights, shifts):
+        self.lpathstr: list = []
+        self.title: str = "Irreducible k-points of {} mesh, shift {}".format(
+            "x".join(str(x) for x in mesh), " ".join(str(x) for x in shifts)
+        )
+
+
+class KMOvasp(KMeshOut):
+    """K-mesh output class for VASP KPOINTS."""
+
+    def __init__(self, mesh, kpts, weights, shifts):
+        super().__init__(mesh, kpts, weights, shifts)
+        rows = AsecIO.format_rows("%16.12f %16.12f %16.12f %8d\n", kpts, weights)
+        self.lpathstr.extend([self.title, str(len(weights)), "Reciprocal", rows[:-1]])
+
+
+class KMOaims(KMeshOut):
+    """K-mesh output class for FHI-aims.
+
+    FHI-aims reduces ``k_grid`` by itself, so the irreducible points are comments.
+    """
+
+    def __init__(self, mesh, kpts, weights, shifts):
+        super().__init__(mesh, kpts, weights, shifts)
+        self.lpathstr.append("k_grid  {} {} {}".format(*mesh))
+        if shifts.any():
+            self.lpathstr.append("k_offset  {} {} {}".format(*(shifts / 2.0)))
+        rows = AsecIO.format_rows("# %14.10f %14.10f %14.10f %8d\n", kpts, weights)
+        self.lpathstr.extend(["# " + self.title, rows[:-1]])
+
+
+class KMOrmg(KMeshOut):
+    """K-mesh output class for RMG."""
+
+    def __init__(self, mesh, kpts, weights, shifts):
+        super().__init__(mesh, kpts, weights, shifts)
+        wts = weights / weights.sum()
+        rows = AsecIO.format_rows("  %14.10f %14.10f %14.10f %14.10f\n", kpts, wts)
+        self.lpathstr.extend(["# " + self.title, 'kpoints = " ', rows[:-1], ' "'])
+
+
 def ___kpath_make_pos(args, kp):
     pre = "primitive_"
     pos = kp[pre + "positions"]
@@ -401,7 +677,7 @@ def ___kpath_make_pos(args, kp):
     nkp = kp.copy()
     nkp[pre + "positions"] = -pos
     # nkp[pre+'lattice']=-cell
-    print("   [WARN] Kpath negative pos(bug?) were inverted")
+    logger.warn("   [WARN] Kpath negative pos(bug?) were inverted")
     return nkp
 
 
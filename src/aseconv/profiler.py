@@ -0,0 +1,155 @@
+"""
+Per-stage timing and memory profiler of the geo pipeline.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+def _rss() -> int:
+    """Current resident set size in bytes (the peak where not available), or 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r if sys.platform == "darwin" else r * 1024
+
+
+class StageProfiler:
+    """Records of wall time, CPU time, memory and atom counts per stage, file and frame.
+
+    The peak memory of a stage is the ``tracemalloc`` peak since the stage started.
+    The peak is process-wide, so it is None for the stages overlapping others (e.g.
+    the writes on ``--wq`` threads during the reads and plugins), and the peak is not
+    reset while a stage is running. CPU time is of the whole process.
+
+    Attributes:
+        records: The list of the stage records.
+    """
+
+    _headfmt = "{:<16} {:>6} {:>11} {:>10} {:>10} {:>6} {:>9} {:>9} {:>10}"
+    _rowfmt = (
+        "{:<16} {:>6} {:>11} {:>10.4f} {:>10.4f} {:>6.1f} {:>9} {:>9.2f} {:>10.4g}"
+    )
+
+    def __init__(self):
+        self.records: list = []
+        self._lock = threading.Lock()
+        self._active = []
+        self._own = not tracemalloc.is_tracing()
+        if self._own:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, file=None, frame: int = None, natoms: int = None):
+        """Record the enclosed code as a stage.
+
+        Args:
+            name: The stage name such as 'read', 'slabaxis', '--kp' or 'write:vasp'.
+            file: The input file.
+            frame: The frame index in the file, or None for the whole file.
+            natoms: The number of atoms.
+
+        Yields:
+            The record ``dict``, e.g. to set ``natoms`` known only after the stage.
+        """
+        rec = {
+            "stage": name,
+            "file": None if file is None else str(file),
+            "frame": frame,
+            "natoms": natoms,
+        }
+        state = {"overlap": False}
+        with self._lock:
+            if self._active:
+                state["overlap"] = True
+                for x in self._active:
+                    x["overlap"] = True
+            else:
+                tracemalloc.reset_peak()
+            self._active.append(state)
+            mem0 = tracemalloc.get_traced_memory()[0]
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["wall"] = time.perf_counter() - t0
+            rec["cpu"] = time.process_time() - cpu0
+            with self._lock:
+                self._active = [x for x in self._active if x is not state]
+                peak = tracemalloc.get_traced_memory()[1] - mem0
+                rec["peak"] = None if state["overlap"] else max(0, peak)
+                rec["rss"] = _rss()
+                self.records.append(rec)
+
+    def summary(self) -> list:
+        """Records aggregated per stage in the first-seen order."""
+        stages = {}
+        with self._lock:
+            records = list(self.records)
+        for r in records:
+            s = stages.get(r["stage"])
+            if s is None:
+                s = {"stage": r["stage"]}
+                for k in ("count", "natoms", "wall", "cpu", "rss"):
+                    s[k] = 0
+                # None if all the stages overlapped others
+                s["peak"] = None
+                stages[r["stage"]] = s
+            s["count"] += 1
+            s["natoms"] += r["natoms"] or 0
+            s["wall"] += r["wall"]
+            s["cpu"] += r["cpu"]
+            if r["peak"] is not None:
+                s["peak"] = max(s["peak"] or 0, r["peak"])
+            s["rss"] = max(s["rss"], r["rss"])
+        return list(stages.values())
+
+    def print_summary(self):
+        """Print the summary table sorted by the total wall time."""
+        rows = sorted(self.summary(), key=lambda x: -x["wall"])
+        total = sum(x["wall"] for x in rows) or 1.0
+        print(">>> Profile (sorted by wall time)")
+        head = ("stage", "count", "natoms", "wall(s)", "cpu(s)", "%wall")
+        head += ("peak(MB)", "rss(MB)", "atoms/s")
+        print(self._headfmt.format(*head))
+        for x in rows:
+            rate = x["natoms"] / x["wall"] if x["wall"] > 0 else 0
+            print(
+                self._rowfmt.format(
+                    x["stage"],
+                    x["count"],
+                    x["natoms"],
+                    x["wall"],
+                    x["cpu"],
+                    100 * x["wall"] / total,
+                    "-" if x["peak"] is None else f"{x['peak'] / 2**20:.2f}",
+                    x["rss"] / 2**20,
+                    rate,
+                )
+            )
+
+    def save(self, file: str):
+        """Dump the records and the summary as JSON."""
+        with self._lock:
+            records = list(self.records)
+        with open(file, "wt") as f:
+            json.dump({"records": records, "summary": self.summary()}, f, indent=1)
+        print(f" - Writing profile '{file}'...")
+
+    def stop(self):
+        """Stop ``tracemalloc`` if started by the profiler."""
+        if self._own and tracemalloc.is_tracing():
+            tracemalloc.stop()
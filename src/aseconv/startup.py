@@ -0,0 +1,156 @@
+"""
+Import-time and startup profiler (``aseconv --startup-profile``).
+
+The startup is profiled in a child process started with ``ASEC_STARTUP_PROFILE`` set
+to a result file. ``aseconv/__init__.py`` then installs an ``__import__`` hook before
+anything else is imported, and the imports, the plugin module loads and the parser
+construction are recorded with their time and memory, and dumped at exit.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import builtins
+import tracemalloc
+import subprocess
+import tempfile
+from importlib.util import resolve_name
+from contextlib import contextmanager, nullcontext
+
+ENV = "ASEC_STARTUP_PROFILE"
+
+# Records of the child process
+records: list = []
+_stack = []
+_active = False
+_import = builtins.__import__
+
+# The startup of the child process
+_child = "import aseconv.main as am; am.acmparser()"
+
+
+@contextmanager
+def _measure(kind, name):
+    frame = {"wall": 0.0, "mem": 0}
+    _stack.append(frame)
+    mem0 = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - t0
+        mem = tracemalloc.get_traced_memory()[0] - mem0
+        _stack.pop()
+        if _stack:
+            _stack[-1]["wall"] += wall
+            _stack[-1]["mem"] += mem
+        records.append(
+            {
+                "kind": kind,
+                "name": name,
+                "wall": wall,
+                "self": wall - frame["wall"],
+                "mem": mem,
+                "selfmem": mem - frame["mem"],
+                "depth": len(_stack),
+            }
+        )
+
+
+def measure(kind: str, name: str):
+    """Context recording a startup step, doing nothing unless profiling.
+
+    Args:
+        kind: 'import', 'plugin' (module load), 'init' (plugin instance) or 'parser'.
+        name: The module, file or step name.
+    """
+    return _measure(kind, name) if _active else nullcontext()
+
+
+def _profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+    full = name
+    if level > 0:
+        try:
+            full = resolve_name("." * level + name, (globals or {}).get("__package__"))
+        except (ImportError, ValueError):
+            pass
+    if full in sys.modules:
+        return _import(name, globals, locals, fromlist, level)
+    with _measure("import", full):
+        return _import(name, globals, locals, fromlist, level)
+
+
+def install(file: str):
+    """Start recording, and dump the records to ``file`` at exit."""
+    global _active
+    if _active:
+        return
+    _active = True
+    tracemalloc.start()
+    builtins.__import__ = _profiled_import
+    atexit.register(dump, file)
+
+
+def dump(file: str):
+    with open(file, "wt") as f:
+        json.dump(records, f)
+
+
+def _print_rows(rows, key):
+    print(f"{'self(ms)':>9} {'total(ms)':>10} {'self(MB)':>9} {'total(MB)':>10}  name")
+    for r in rows:
+        print(
+            "{:>9.2f} {:>10.2f} {:>9.2f} {:>10.2f}  {}{}".format(
+                1e3 * r["self"],
+                1e3 * r["wall"],
+                r["selfmem"] / 2**20,
+                r["mem"] / 2**20,
+                f"[{r['kind']}] " if key == "total" else "",
+                r["name"],
+            )
+        )
+
+
+def report(recs: list, total: float, top: int = 30):
+    """Print the startup steps sorted by the total time, and the imports by self time.
+
+    Args:
+        recs: The records.
+        total: The wall time of the child process.
+        top: The number of the printed imports.
+    """
+    steps = [r for r in recs if r["kind"] != "import"]
+    imports = [r for r in recs if r["kind"] == "import"]
+    print(f">>> Startup profile ({1e3 * total:.1f} ms in total, with tracemalloc)")
+    for kind in ("import", "plugin", "init", "parser"):
+        rs = [r for r in recs if r["kind"] == kind]
+        tself = sum(r["self"] for r in rs)
+        print(f" - {kind:<7} {len(rs):>5} steps {1e3 * tself:>10.2f} ms (self)")
+    print(">>> Plugin loads and parser construction (sorted by total time)")
+    _print_rows(sorted(steps, key=lambda x: -x["wall"]), "total")
+    print(f">>> Top {top} imports (sorted by self time)")
+    _print_rows(sorted(imports, key=lambda x: -x["self"])[:top], "self")
+
+
+def run(top: int = 30) -> int:
+    """Profile the startup in a child process and print the report.
+
+    Returns:
+        The exit code.
+    """
+    with tempfile.TemporaryDirectory() as td:
+        file = os.path.join(td, "startup.json")
+        env = dict(os.environ)
+        env[ENV] = file
+        t0 = time.perf_counter()
+        ret = subprocess.run([sys.executable, "-c", _child], env=env).returncode
+        total = time.perf_counter() - t0
+        if ret != 0 or not os.path.exists(file):
+            print(f" - Startup profiling failed ({ret})...")
+            return 1
+        with open(file) as f:
+            recs = json.load(f)
+    report(recs, total, top)
+    return 0
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].joinpath("src")))
+
+
+@pytest.fixture
+def aseconv_run(monkeypatch, tmp_path):
+    """Run an aseconv command line in ``tmp_path``, returning the exit code."""
+    import aseconv.main as am
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MPLBACKEND", "Agg")
+    parser = am.acmparser()
+
+    def run(*sargs):
+        sargs = [str(x) for x in sargs]
+        args = parser.parse_args(sargs)
+        return args.func(sargs, args)
+
+    return run
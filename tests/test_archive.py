@@ -0,0 +1,49 @@
+import io
+import tarfile
+
+import pytest
+import ase.io
+from ase.build import bulk
+
+pytest.importorskip("seekpath")
+
+
+def _tar_of_members(file, names):
+    with tarfile.open(file, "w") as tf:
+        for name, atom in names.items():
+            buf = io.StringIO()
+            ase.io.write(buf, atom, format="vasp")
+            data = buf.getvalue().encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def two_posc(tmp_path):
+    """An archive of two 'POSCAR' members in different directories."""
+    file = tmp_path.joinpath("ds.tar")
+    _tar_of_members(file, {"d1/POSCAR": bulk("Si"), "d2/POSCAR": bulk("Cu")})
+    return file
+
+
+def test_kp_side_files_mirror_member_dirs(aseconv_run, tmp_path, two_posc):
+    assert aseconv_run("geo", "-t", "aims", "ds.tar::*/POSCAR", "--kp", "") == 0
+    out = tmp_path.joinpath("0conv_aims_ds")
+    for d, el in (("d1", "Si"), ("d2", "Cu")):
+        assert out.joinpath(d, "POSCAR_KP.in").exists()
+        assert out.joinpath(d, "POSCAR_KP.akp").exists()
+        assert el in out.joinpath(d, "POSCAR_KP.in").read_text()
+    assert not out.joinpath("POSCAR_KP.akp").exists()
+
+
+def test_kp_side_files_in_archive_output(aseconv_run, tmp_path, two_posc):
+    sargs = ["geo", "-t", "aims,rmg", "ds.tar::*/POSCAR", "--kp", "", "-o", "kp.tar"]
+    assert aseconv_run(*sargs) == 0
+    with tarfile.open(tmp_path.joinpath("kp.tar")) as tf:
+        names = tf.getnames()
+    assert len(names) == len(set(names))
+    for d in ("d1", "d2"):
+        assert f"{d}/POSCAR_KP.in" in names
+        assert f"{d}/POSCAR_KP_aims.akp" in names
+        assert f"{d}/POSCAR_KP_rmg.akp" in names
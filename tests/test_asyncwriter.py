@@ -0,0 +1,39 @@
+import pytest
+
+from aseconv.asyncwriter import AsyncWriter
+
+
+def _fail(name):
+    raise ValueError(f"bad {name}")
+
+
+def test_error_names_failed_output():
+    done = []
+    w = AsyncWriter(4)
+    w.submit("a.in", done.append, "a.in")
+    w.submit("b.in", _fail, "b.in")
+    w.submit("c.in", done.append, "c.in")
+    with pytest.raises(RuntimeError, match="'b.in'") as ei:
+        w.wait()
+    assert isinstance(ei.value.__cause__, ValueError)
+    assert done == ["a.in"]
+    # Raised once, and the remaining tasks are skipped
+    w.submit("d.in", done.append, "d.in")
+    w.close()
+    assert done == ["a.in"]
+
+
+def test_convert_reports_failed_output(aseconv_run, monkeypatch):
+    from ase.build import bulk
+    import aseconv.main as am
+
+    bulk("Si").write("x.xyz")
+    bulk("Cu").write("y.xyz")
+
+    def write(self, args, atom, ofile, log=True):
+        if "Cu" in atom.get_chemical_symbols():
+            raise ValueError("disk full")
+
+    monkeypatch.setattr(am.AseConv, "_write", write)
+    with pytest.raises(RuntimeError, match="y.in' failed"):
+        aseconv_run("geo", "-t", "aims", "--wq", "2", "x.xyz", "y.xyz")
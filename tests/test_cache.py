@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+from ase.build import bulk
+
+from aseconv.cache import ResultCache
+
+
+@pytest.fixture
+def convert(aseconv_run, monkeypatch):
+    """Convert ``x.xyz`` to aims with the result cache, returning whether it hit."""
+    hits = []
+    materialize = ResultCache.materialize
+
+    def spy(self, key, suffix, ofile):
+        hits.append(materialize(self, key, suffix, ofile))
+        return hits[-1]
+
+    monkeypatch.setattr(ResultCache, "materialize", spy)
+    bulk("Si").write("x.xyz")
+
+    def run(*opts, out="x.in"):
+        hits.clear()
+        assert aseconv_run("geo", "-f", "-t", "aims", "--cache", "c", *opts, "x.xyz") == 0
+        assert Path(out).exists()
+        assert len(hits) == 1
+        return hits[0]
+
+    return run
+
+
+def test_miss_then_hit(convert):
+    assert not convert()
+    first = Path("x.in").read_bytes()
+    Path("x.in").unlink()
+    assert convert()
+    assert Path("x.in").read_bytes() == first
+
+
+def test_options_not_affecting_output(convert):
+    assert not convert()
+    assert convert("--quiet")
+    assert convert("--wq", "2")
+
+
+def test_global_option_invalidates(convert):
+    assert not convert()
+    direct = Path("x.in").read_text()
+    assert not convert("-C")
+    assert Path("x.in").read_text() != direct
+    assert convert("-C")
+    assert convert()
+    assert Path("x.in").read_text() == direct
+
+
+def test_plugin_argument_invalidates(convert):
+    opts = ["-o", "y.in", "--tr"]
+    assert not convert(*opts, "0.1,0,0", out="y.in")
+    assert convert(*opts, "0.1,0,0", out="y.in")
+    assert not convert(*opts, "0.2,0,0", out="y.in")
+    assert convert(*opts, "0.2,0,0", out="y.in")
+    assert not convert(*opts, "0.2,0,0", "-r", "2,1,1", out="y.in")
+
+
+def test_input_change_invalidates(convert):
+    assert not convert()
+    bulk("Ge").write("x.xyz")
+    assert not convert()
+    assert "Ge" in Path("x.in").read_text()
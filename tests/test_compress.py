@@ -0,0 +1,30 @@
+import ase.io
+import numpy as np
+import pytest
+from ase.build import bulk
+
+from aseconv.compress import codecs
+
+magic = {"gz": b"\x1f\x8b", "bz2": b"BZh", "xz": b"\xfd7zXZ"}
+
+
+@pytest.mark.parametrize("codec", ["gz", "bz2", "xz"])
+@pytest.mark.parametrize(
+    "type,ext", [("aims", "in"), ("rmg", "rmg"), ("lmp", "lmp"), ("extxyz", "xyz")]
+)
+def test_roundtrip(aseconv_run, tmp_path, codec, type, ext):
+    atom = bulk("NaCl", "rocksalt", a=5.6, cubic=True)
+    atom.rattle(0.05, seed=2)
+    atom.write("x.xyz")
+    assert aseconv_run("geo", "-t", type, "--compress", codec, "x.xyz") == 0
+    ofile = tmp_path.joinpath(f"x.{ext}.{codec}")
+    assert ofile.read_bytes().startswith(magic[codec])
+    with codecs["." + codec].open(ofile, "rt") as f:
+        assert len(f.read()) > 0
+
+    # Read back by the suffix, and written uncompressed
+    assert aseconv_run("geo", "-t", "extxyz", "-o", "back.xyz", ofile.name) == 0
+    back = ase.io.read("back.xyz")
+    assert back.get_chemical_symbols() == atom.get_chemical_symbols()
+    assert np.allclose(back.cell.array, atom.cell.array)
+    assert np.allclose(back.positions, atom.positions)
@@ -0,0 +1,99 @@
+import ase.io
+import numpy as np
+import pytest
+
+from aseconv import geoutil as gu
+from aseconv.pluginbase import AsecIO
+from aseconv.plugins.ioaims import AimsIO
+
+periodic = """\
+# comment
+lattice_vector 5.0 0.0 0.0
+constrain_relaxation .true.
+lattice_vector 0.5 5.5 0.0
+lattice_vector 0.0 0.3 6.0
+atom_frac 0.0 0.0 0.0 Si
+  initial_moment 1.5
+  constrain_relaxation .true.
+atom_frac 0.25 0.25 0.25 O
+  constrain_relaxation x
+  constrain_relaxation z
+atom_frac 0.5 0.1 0.7 Si
+  initial_moment -0.5
+atom_frac 0.9 0.6 0.3 Ge
+  constrain_relaxation y
+"""
+
+molecule = """\
+atom 0.0 0.0 0.0 O
+  constrain_relaxation .true.
+atom 0.76 0.59 0.0 H
+  initial_moment 0.5
+  constrain_relaxation z
+atom -0.76 0.59 0.0 H
+"""
+
+symmetry = """\
+lattice_vector 4.0 0.0 0.0
+lattice_vector 0.0 4.0 0.0
+lattice_vector 0.0 0.0 4.0
+atom_frac 0.0 0.0 0.0 Na
+atom_frac 0.5 0.5 0.5 Cl
+symmetry_n_params 1 1 0
+symmetry_params a
+symmetry_lv a , 0 , 0
+symmetry_lv 0 , a , 0
+symmetry_lv 0 , 0 , a
+symmetry_frac 0 , 0 , 0
+symmetry_frac 0.5 , 0.5 , 0.5
+"""
+
+
+def _compare(tmp_path, text):
+    file = tmp_path.joinpath("geometry.in")
+    file.write_text(text)
+    (atom,) = AimsIO().read(file, "aims")
+    ref = ase.io.read(file, format="aims")
+    assert atom.get_chemical_symbols() == ref.get_chemical_symbols()
+    assert atom.pbc.tolist() == ref.pbc.tolist()
+    assert np.allclose(atom.cell.array, ref.cell.array)
+    assert np.allclose(atom.positions, ref.positions)
+    assert np.allclose(
+        atom.get_initial_magnetic_moments(), ref.get_initial_magnetic_moments()
+    )
+    mask, _ = gu.constraint_mask(atom)
+    rmask, _ = gu.constraint_mask(ref)
+    assert mask.tolist() == rmask.tolist()
+    return atom, mask
+
+
+def test_periodic_equals_ase(tmp_path):
+    atom, mask = _compare(tmp_path, periodic)
+    assert mask.tolist() == [[1, 1, 1], [1, 0, 1], [0, 0, 0], [0, 1, 0]]
+    assert atom.get_initial_magnetic_moments().tolist() == [1.5, 0, -0.5, 0]
+
+
+def test_molecule_equals_ase(tmp_path):
+    atom, mask = _compare(tmp_path, molecule)
+    assert not atom.pbc.any()
+    assert mask.tolist() == [[1, 1, 1], [0, 0, 1], [0, 0, 0]]
+
+
+def test_symmetry_falls_back_to_ase(tmp_path, monkeypatch):
+    called = []
+    read = AsecIO.read
+
+    def spy(self, file, type, **kwargs):
+        called.append(file)
+        return read(self, file, type, **kwargs)
+
+    monkeypatch.setattr(AsecIO, "read", spy)
+    _compare(tmp_path, symmetry)
+    assert len(called) == 1
+
+
+def test_mixed_coordinates_raise(tmp_path):
+    file = tmp_path.joinpath("geometry.in")
+    file.write_text(periodic.replace("atom_frac 0.5 0.1 0.7", "atom 1.0 1.0 1.0"))
+    with pytest.raises(Exception, match="mixture"):
+        AimsIO().read(file, "aims")
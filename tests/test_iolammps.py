@@ -0,0 +1,62 @@
+import ase.io
+import numpy as np
+import pytest
+
+from aseconv.plugins.iolammps import LammpsIO
+
+header = """\
+LAMMPS data file
+
+4 atoms
+2 atom types
+
+ 0.5 5.5 xlo xhi
+-0.2 4.8 ylo yhi
+ 0.0 6.0 zlo zhi
+ 1.0 -0.5 0.3 xy xz yz
+
+Masses
+
+1 28.0855 # Si
+2 15.999
+
+Atoms{hint}
+
+"""
+
+# id, mol, type, charge, x, y, z
+rows = [
+    (3, 1, 2, -1.2, 2.0, 2.5, 3.0),
+    (1, 1, 1, 2.4, 0.6, 0.1, 0.2),
+    (4, 2, 2, -1.2, 4.0, 1.0, 5.5),
+    (2, 2, 1, 0.0, 3.1, 3.9, 1.7),
+]
+cols = {
+    "atomic": (0, 2, 4, 5, 6),
+    "charge": (0, 2, 3, 4, 5, 6),
+    "full": (0, 1, 2, 3, 4, 5, 6),
+}
+exts = {"atomic": "lmp", "charge": "lmpc", "full": "lmpf"}
+
+
+@pytest.mark.parametrize("hint", [True, False])
+@pytest.mark.parametrize("style", ["atomic", "charge", "full"])
+def test_equals_ase(tmp_path, style, hint):
+    # The style of the Atoms section comment, otherwise of the extension
+    hint = f" # {style}" if hint else ""
+    lines = [" ".join(str(r[i]) for i in cols[style]) for r in rows]
+    file = tmp_path.joinpath("data." + exts[style])
+    file.write_text(header.format(hint=hint) + "\n".join(lines) + "\n")
+    (atom,) = LammpsIO().read(file, None)
+    ref = ase.io.read(file, format="lammps-data", atom_style=style, units="metal")
+
+    # Species by the Masses, atoms sorted by the IDs
+    assert atom.get_chemical_symbols() == ["Si", "Si", "O", "O"]
+    assert atom.get_chemical_symbols() == ref.get_chemical_symbols()
+    assert np.allclose(atom.cell.array, ref.cell.array)
+    assert atom.cell[1, 0] == 1.0 and atom.cell[2, 2] == 6.0
+    assert np.allclose(atom.positions, ref.positions)
+    assert np.allclose(atom.get_masses(), ref.get_masses())
+    assert np.allclose(atom.get_initial_charges(), ref.get_initial_charges())
+    if style == "full":
+        assert atom.arrays["mol-id"].tolist() == ref.arrays["mol-id"].tolist()
@@ -0,0 +1,103 @@
+import argparse
+
+import numpy as np
+import pytest
+from ase.build import bulk, fcc111
+from ase.constraints import FixAtoms, FixCartesian
+from ase.units import Bohr
+
+from aseconv import geoutil as gu
+from aseconv.plugins.iormg import RMGIO
+
+
+def _roundtrip(tmp_path, atom, C=False):
+    file = tmp_path.joinpath("x.rmg")
+    RMGIO().write(argparse.Namespace(C=C, clevel=6), atom, "rmg", file)
+    text = file.read_text()
+    return RMGIO().read(file, "rmg")[0], text
+
+
+@pytest.mark.parametrize("C", [False, True])
+def test_lattice_vector_roundtrip(tmp_path, C):
+    atom = bulk("NaCl", "rocksalt", a=5.6).repeat((2, 1, 1))
+    atom.rattle(0.05, seed=1)
+    ratom, text = _roundtrip(tmp_path, atom, C)
+    assert "lattice_vector" in text
+    assert ("Cell Relative" in text) != C
+    assert ratom.get_chemical_symbols() == atom.get_chemical_symbols()
+    assert np.allclose(ratom.cell.array, atom.cell.array)
+    assert np.allclose(ratom.get_positions(), atom.get_positions())
+
+
+def test_movable_flags_roundtrip(tmp_path):
+    atom = fcc111("Cu", size=(1, 1, 3), vacuum=5.0)
+    atom.set_constraint([FixAtoms([0]), FixCartesian([1], [False, False, True])])
+    ratom, text = _roundtrip(tmp_path, atom)
+    assert "   0 0 0\n" in text and "   1 1 0\n" in text
+    mask, _ = gu.constraint_mask(ratom)
+    assert mask.tolist() == [[1, 1, 1], [0, 0, 1], [0, 0, 0]]
+
+
+def _write(tmp_path, text):
+    file = tmp_path.joinpath("y.rmg")
+    file.write_text(text)
+    return file
+
+
+def test_length_fallback(tmp_path):
+    file = _write(
+        tmp_path,
+        """
+bravais_lattice_type = "Orthorhombic Primitive"
+a_length = "10.0"
+b_length = "11.0"
+c_length = "12.0"
+atomic_coordinate_type = "Absolute"
+crds_units = "Bohr"
+atoms = "
+H 1.0 2.0 3.0 1 1 1
+H 2.0 2.0 3.0 0 0 0
+"
+""",
+    )
+    atom = RMGIO().read(file, "rmg")[0]
+    assert np.allclose(atom.cell.array, np.diag([10.0, 11.0, 12.0]) * Bohr)
+    assert np.allclose(atom.positions[0], np.array([1.0, 2.0, 3.0]) * Bohr)
+    mask, _ = gu.constraint_mask(atom)
+    assert mask.tolist() == [[0, 0, 0], [1, 1, 1]]
+
+
+def test_length_fallback_hexagonal(tmp_path):
+    file = _write(
+        tmp_path,
+        """
+bravais_lattice_type = "Hexagonal Primitive"
+lattice_units = "Angstrom"
+a_length = "2.46"
+b_length = "2.46"
+c_length = "10.0"
+atomic_coordinate_type = "Cell Relative"
+atoms = "
+C 0.0 0.0 0.5
+C 0.3333333333 0.6666666667 0.5
+"
+""",
+    )
+    atom = RMGIO().read(file, "rmg")[0]
+    assert np.allclose(atom.cell.cellpar(), [2.46, 2.46, 10.0, 90, 90, 120])
+    assert np.allclose(atom.get_scaled_positions()[1], [1 / 3, 2 / 3, 0.5])
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        'bravais_lattice_type = "Cubic Face Centered"\n',
+        'bravais_lattice_type = "Cubic Primitive"\ncrds_units = "Parsec"\n',
+        'bravais_lattice_type = "Cubic Primitive"\nlattice_units = "Parsec"\n',
+    ],
+)
+def test_unsupported(tmp_path, keys):
+    text = keys + 'a_length = "5"\nb_length = "5"\nc_length = "5"\n'
+    file = _write(tmp_path, text + 'atoms = "\nH 0 0 0\n"\n')
+    with pytest.raises(Exception, match="Unsupported"):
+        RMGIO().read(file, "rmg")
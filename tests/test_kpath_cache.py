@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import ase.io
+from ase import Atoms
+
+from aseconv import geoutil as gu
+
+pytest.importorskip("seekpath")
+
+
+def _p1(mirror=False, shift=0.0):
+    rng = np.random.default_rng(7)
+    cell = np.diag([4.1, 4.7, 5.3]) + rng.uniform(-0.4, 0.4, (3, 3))
+    pos = rng.uniform(0, 1, (5, 3)) @ cell
+    pos[0] += shift
+    atom = Atoms("SiO2Ge2", positions=pos, cell=cell, pbc=True)
+    if mirror:
+        flip = np.diag([-1.0, 1.0, 1.0])
+        atom.set_cell(atom.cell.array @ flip)
+        atom.set_positions(atom.get_positions() @ flip)
+    return atom
+
+
+def test_fingerprint_of_mirror_and_perturbed():
+    fp = gu.structure_fingerprint(_p1())
+    assert gu.structure_fingerprint(_p1(mirror=True)) != fp
+    exact = gu.structure_fingerprint(_p1(), exact=True)
+    assert gu.structure_fingerprint(_p1(shift=1e-6), exact=True) != exact
+    assert gu.structure_fingerprint(_p1(), exact=True) == exact
+
+
+def _kp_out(run, tmp_path, atom, name, cache):
+    ase.io.write(tmp_path.joinpath(name + ".xyz"), atom, format="extxyz")
+    sargs = ["geo", "-t", "aims", name + ".xyz", "--kp", "", "-f"]
+    if cache:
+        sargs += ["--cache", "cache"]
+    assert run(*sargs) == 0
+    return ase.io.read(tmp_path.joinpath(name + "_KP.in"), format="aims")
+
+
+@pytest.mark.parametrize("other", [_p1(mirror=True), _p1(shift=2e-5)])
+def test_kp_cache_returns_own_geometry(aseconv_run, tmp_path, other):
+    _kp_out(aseconv_run, tmp_path, _p1(), "a", True)
+    cached = _kp_out(aseconv_run, tmp_path, other, "b", True)
+    fresh = _kp_out(aseconv_run, tmp_path, other, "b", False)
+    assert np.allclose(cached.cell.array, fresh.cell.array)
+    assert np.allclose(cached.get_positions(), fresh.get_positions())
@@ -0,0 +1,19 @@
+import pytest
+
+from aseconv.metrics import LatencyHistogram
+
+
+def test_quantiles_are_interpolated_within_buckets():
+    hist = LatencyHistogram()
+    for sec in (4.0, 5.0, 6.0, 7.0):
+        hist.add(sec)
+    d = hist.todict()
+    # All in the (3, 10] bucket, clamped to the measured 4..7 s
+    assert d["buckets"]["le_10"] == 4
+    assert d["p50"] == pytest.approx(5.5)
+    assert d["p95"] == pytest.approx(6.85)
+    assert 4.0 <= d["p50"] <= d["p95"] <= 7.0
+
+
+def test_empty_quantile():
+    assert LatencyHistogram().quantile(0.5) is None
@@ -0,0 +1,30 @@
+import threading
+
+from aseconv.profiler import StageProfiler
+
+
+def test_overlapping_stages_have_no_peak():
+    prof = StageProfiler()
+    started, done = threading.Event(), threading.Event()
+
+    def write():
+        with prof.stage("write:xyz"):
+            started.set()
+            done.wait(5)
+
+    th = threading.Thread(target=write)
+    th.start()
+    started.wait(5)
+    with prof.stage("read"):
+        buf = bytearray(2**20)
+    done.set()
+    th.join()
+    with prof.stage("slabaxis"):
+        buf = bytearray(2**20)
+    prof.stop()
+
+    peaks = {r["stage"]: r["peak"] for r in prof.records}
+    assert peaks["read"] is None
+    assert peaks["write:xyz"] is None
+    assert peaks["slabaxis"] > 2**19
+    assert len(buf) == 2**20
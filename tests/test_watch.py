@@ -0,0 +1,33 @@
+import time
+
+import ase.io
+from ase.build import bulk
+
+
+def test_watch_keeps_polling_after_a_bad_file(aseconv_run, tmp_path, monkeypatch):
+    din = tmp_path.joinpath("in")
+    din.mkdir()
+    # Actions before each poll; a file is converted at the second poll seeing it.
+    steps = [
+        lambda: din.joinpath("bad.xyz").write_text("not a structure\n"),
+        None,
+        lambda: ase.io.write(din.joinpath("good.xyz"), bulk("Si")),
+        None,
+        None,
+    ]
+    polls = []
+
+    def sleep(sec):
+        if len(polls) == len(steps):
+            raise KeyboardInterrupt
+        step = steps[len(polls)]
+        polls.append(sec)
+        if step is not None:
+            step()
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    assert aseconv_run("geo", "-t", "aims", "in", "--watch", "0.01") == 0
+    out = tmp_path.joinpath("0conv_aims_in")
+    assert out.joinpath("good.in").exists()
+    assert not out.joinpath("bad.in").exists()
+    assert len(polls) == len(steps)